@@ -0,0 +1,4 @@
+"""Benchmarks of fluentogram hot paths over synthetic catalogs.
+
+Run them with "python -m benchmarks run", see README.md.
+"""
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import Any
+
+from benchmarks import cases  # noqa: F401  # registers benchmarks
+from benchmarks.catalog import Catalog, CatalogSpec
+from benchmarks.harness import BENCHMARKS, compare, load, report_changes, run, save
+
+
+def _compare(baseline: dict[str, Any], current: dict[str, Any], threshold: float) -> int:
+    if baseline["meta"]["catalog"] != current["meta"]["catalog"]:
+        print("Warning: results were measured on different catalogs, see meta.catalog\n")
+    regressions = report_changes(compare(baseline, current), threshold)
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run benchmarks and write results to JSON")
+    run_parser.add_argument("names", nargs="*", help=f"Name prefixes of benchmarks to run: {', '.join(BENCHMARKS)}")
+    run_parser.add_argument("-o", "--output", help="Path of the JSON results")
+    run_parser.add_argument("-b", "--baseline", help="Path of saved JSON results to compare with")
+    run_parser.add_argument("-t", "--threshold", type=float, default=0.1, help="Slowdown reported as a regression")
+    run_parser.add_argument("-r", "--rounds", type=int, default=5, help="Timed rounds of every benchmark")
+    defaults = CatalogSpec()
+    run_parser.add_argument("--locales", type=int, default=defaults.locales, help="Number of locales")
+    run_parser.add_argument("--keys", type=int, default=defaults.keys, help="Number of keys of the root locale")
+    run_parser.add_argument("--placeables", type=float, default=defaults.placeable_ratio, help="Share of placeables")
+    run_parser.add_argument("--selects", type=float, default=defaults.select_ratio, help="Share of selects")
+    run_parser.add_argument(
+        "--coverage",
+        type=float,
+        default=defaults.fallback_coverage,
+        help="Share of keys translated by non-root locales",
+    )
+    run_parser.add_argument("--seed", type=int, default=defaults.seed, help="Seed of the catalog generator")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two saved JSON results")
+    compare_parser.add_argument("baseline", help="Path of the baseline results")
+    compare_parser.add_argument("current", help="Path of the current results")
+    compare_parser.add_argument("-t", "--threshold", type=float, default=0.1, help="Slowdown reported as a regression")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        return _compare(load(args.baseline), load(args.current), args.threshold)
+
+    catalog = Catalog(
+        CatalogSpec(
+            locales=args.locales,
+            keys=args.keys,
+            placeable_ratio=args.placeables,
+            select_ratio=args.selects,
+            fallback_coverage=args.coverage,
+            seed=args.seed,
+        ),
+    )
+    baseline = load(args.baseline) if args.baseline else None
+    report = run(catalog, args.rounds, args.names)
+    if args.output:
+        save(report, args.output)
+    if baseline is not None:
+        print()
+        return _compare(baseline, report, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""Benchmarks of the library hot paths, registered in the order they run"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import tempfile
+from collections.abc import Iterator
+from contextlib import suppress
+from decimal import Decimal
+from pathlib import Path
+
+from fluent_compiler.bundle import FluentBundle
+
+from benchmarks.catalog import ARGS, Catalog
+from benchmarks.harness import Case, Skip, benchmark
+from fluentogram import FluentTranslator, MoneyTransformer, TranslatorHub
+from fluentogram.exceptions import KeyNotFoundError
+from fluentogram.storage import FileStorage
+
+BATCH_SIZE = 100
+
+
+def _hub(catalog: Catalog) -> TranslatorHub:
+    return TranslatorHub(catalog.locales_map, catalog.translators(), root_locale=catalog.root_locale)
+
+
+def _fallback_locale(catalog: Catalog) -> str:
+    if len(catalog.locales) < 2:  # noqa: PLR2004
+        raise Skip("needs at least 2 locales")
+    return catalog.locales[1]
+
+
+@benchmark("runner.get")
+def runner_get(catalog: Catalog) -> Iterator[Case]:
+    runner = _hub(catalog).get_translator_by_locale(catalog.root_locale)
+    keys = catalog.keys
+
+    def operation() -> None:
+        for key in keys:
+            runner.get(key, **ARGS)
+
+    yield Case(operation, len(keys))
+
+
+@benchmark("runner.dot_access")
+def runner_dot_access(catalog: Catalog) -> Iterator[Case]:
+    runner = _hub(catalog).get_translator_by_locale(catalog.root_locale)
+    paths = [key.split("-") for key in catalog.keys]
+
+    def operation() -> None:
+        for section, message in paths:
+            getattr(getattr(runner, section), message)(**ARGS)
+
+    yield Case(operation, len(paths))
+
+
+@benchmark("runner.get_fallback")
+def runner_get_fallback(catalog: Catalog) -> Iterator[Case]:
+    locale = _fallback_locale(catalog)
+    runner = _hub(catalog).get_translator_by_locale(locale)
+    keys = catalog.fallback_keys(locale)
+    if not keys:
+        raise Skip("the fallback coverage leaves no keys to the root locale")
+
+    def operation() -> None:
+        for key in keys:
+            runner.get(key, **ARGS)
+
+    yield Case(operation, len(keys))
+
+
+@benchmark("runner.get_missing")
+def runner_get_missing(catalog: Catalog) -> Iterator[Case]:
+    locale = catalog.locales[-1]
+    runner = _hub(catalog).get_translator_by_locale(locale)
+    keys = [f"missing-message{i}" for i in range(BATCH_SIZE)]
+
+    def operation() -> None:
+        for key in keys:
+            with suppress(KeyNotFoundError):
+                runner.get(key, **ARGS)
+
+    yield Case(operation, len(keys))
+
+
+@benchmark("translator.get")
+def translator_get(catalog: Catalog) -> Iterator[Case]:
+    translator = catalog.translators()[0]
+    keys = catalog.keys
+
+    def operation() -> None:
+        for key in keys:
+            translator.get(key, **ARGS)
+
+    yield Case(operation, len(keys))
+
+
+@benchmark("transformers.money")
+def transformers_money(catalog: Catalog) -> Iterator[Case]:
+    locale = catalog.root_locale
+    translator = FluentTranslator(locale, FluentBundle.from_string(locale, "price = { $amount }"))
+    # A price list: the same prices are formatted over and over
+    amounts = [Decimal(i % 50) + Decimal("0.99") for i in range(BATCH_SIZE)]
+
+    def operation() -> None:
+        for amount in amounts:
+            translator.get("price", amount=MoneyTransformer(amount, currency="USD", currency_display="symbol"))
+
+    yield Case(operation, len(amounts))
+
+
+@benchmark("hub.construct")
+def hub_construct(catalog: Catalog) -> Iterator[Case]:
+    translators = catalog.translators()
+
+    def operation() -> None:
+        TranslatorHub(catalog.locales_map, translators, root_locale=catalog.root_locale)
+
+    yield Case(operation)
+
+
+@benchmark("hub.get_translator_by_locale")
+def hub_get_translator_by_locale(catalog: Catalog) -> Iterator[Case]:
+    hub = _hub(catalog)
+    locales = catalog.locales * BATCH_SIZE
+
+    def operation() -> None:
+        for locale in locales:
+            hub.get_translator_by_locale(locale)
+
+    yield Case(operation, len(locales))
+
+
+@benchmark("update.single")
+def update_single(catalog: Catalog) -> Iterator[Case]:
+    hub = _hub(catalog)
+    keys = itertools.cycle(catalog.keys)
+    values = itertools.count()
+    loop = asyncio.new_event_loop()
+
+    async def update() -> None:
+        for key in itertools.islice(keys, BATCH_SIZE):
+            await hub.update_translation(catalog.root_locale, key, f"Updated {next(values)}, {{ $name }}")
+
+    try:
+        yield Case(lambda: loop.run_until_complete(update()), BATCH_SIZE)
+    finally:
+        loop.close()
+
+
+@benchmark("update.bulk")
+def update_bulk(catalog: Catalog) -> Iterator[Case]:
+    hub = _hub(catalog)
+    keys = itertools.cycle(catalog.keys)
+    values = itertools.count()
+    loop = asyncio.new_event_loop()
+
+    async def update() -> None:
+        value = next(values)
+        translations = dict.fromkeys(itertools.islice(keys, BATCH_SIZE), f"Updated {value}, {{ $name }}")
+        await hub.update_translations(catalog.root_locale, translations)
+
+    try:
+        yield Case(lambda: loop.run_until_complete(update()), BATCH_SIZE)
+    finally:
+        loop.close()
+
+
+@benchmark("file_storage.cold_load")
+def file_storage_cold_load(catalog: Catalog) -> Iterator[Case]:
+    with tempfile.TemporaryDirectory() as directory:
+        path = catalog.write(Path(directory))
+        yield Case(lambda: FileStorage(path))
+
+
+@benchmark("file_storage.cached_load")
+def file_storage_cached_load(catalog: Catalog) -> Iterator[Case]:
+    with tempfile.TemporaryDirectory() as directory:
+        path = catalog.write(Path(directory) / "locales")
+        cache_dir = Path(directory) / "cache"
+        FileStorage(path, lazy=True, cache_dir=cache_dir).populate_cache()
+        yield Case(lambda: FileStorage(path, cache_dir=cache_dir))
+
+
+@benchmark("nats.apply")
+def nats_apply(catalog: Catalog) -> Iterator[Case]:
+    try:
+        from fluentogram.nats.storage import NatsKvStorage
+        from tests.fake_nats import FakeJetStream, FakeKv
+    except ImportError as e:
+        message = f"needs nats-py: {e}"
+        raise Skip(message) from None
+
+    loop = asyncio.new_event_loop()
+    kv = FakeKv()
+    applied = asyncio.Event()
+    target = 0
+
+    def on_batch(_: object) -> None:
+        if storage.metrics.changes_applied >= target:
+            applied.set()
+
+    async def setup() -> NatsKvStorage:
+        # The storage starts its listener task, so it is created in the loop
+        storage = NatsKvStorage(kv, FakeJetStream(kv), locales=[catalog.root_locale])
+        await storage.ready()
+        TranslatorHub(catalog.locales_map, catalog.translators(), root_locale=catalog.root_locale, storage=storage)
+        storage.metrics.add_batch_listener(on_batch)
+        return storage
+
+    keys = itertools.cycle(catalog.keys)
+    values = itertools.count()
+
+    async def apply() -> None:
+        # Publish a batch to the bucket, and wait until the listener has compiled and applied all of it
+        nonlocal target
+        target = storage.metrics.changes_applied + BATCH_SIZE
+        applied.clear()
+        value = next(values)
+        for key in itertools.islice(keys, BATCH_SIZE):
+            await kv.put(f"{catalog.root_locale}.{key}", storage.serializer(f"Updated {value}, {{ $name }}"))
+        await asyncio.wait_for(applied.wait(), 60)
+
+    storage = loop.run_until_complete(setup())
+    try:
+        yield Case(lambda: loop.run_until_complete(apply()), BATCH_SIZE)
+    finally:
+        loop.run_until_complete(storage.close())
+        loop.close()
+
+
+@benchmark("stubs.generate")
+def stubs_generate(catalog: Catalog) -> Iterator[Case]:
+    try:
+        from fluentogram.stub_generator.generator import Generator
+    except ImportError as e:
+        message = f"needs jinja2: {e}"
+        raise Skip(message) from None
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = catalog.write(Path(directory) / "locales")
+        output_file = Path(directory) / "stubs.pyi"
+        yield Case(lambda: Generator(str(output_file), directory=str(path / catalog.root_locale)).generate())
@@ -0,0 +1,102 @@
+"""Synthetic catalogs of N locales x M keys"""
+
+from __future__ import annotations
+
+import random
+from pathlib import Path
+from typing import NamedTuple
+
+from fluent_compiler.bundle import FluentBundle
+
+from fluentogram import FluentTranslator
+
+# Real locale codes, fluent_compiler needs plural rules of every locale
+LOCALES = ("en", "ru", "de", "fr", "es", "it", "pt", "pl", "uk", "tr", "nl", "sv", "cs", "ja", "ko", "zh")
+SECTIONS = 50
+# Arguments of every benchmarked call: placeables use $name, selects use $count
+ARGS = {"name": "Alex", "count": 3}
+
+
+class CatalogSpec(NamedTuple):
+    locales: int = 3
+    keys: int = 1000
+    # Shares of messages with a variable placeable, and with a select expression. The rest are static texts
+    placeable_ratio: float = 0.3
+    select_ratio: float = 0.1
+    # Share of keys of the root locale, which every other locale translates. The rest fall back to the root locale
+    fallback_coverage: float = 0.8
+    seed: int = 0
+
+
+class Catalog:
+    """FTL texts generated by a CatalogSpec. The first locale is the root one, and has all keys."""
+
+    def __init__(self, spec: CatalogSpec) -> None:
+        if not 1 <= spec.locales <= len(LOCALES):
+            message = f"Number of locales must be between 1 and {len(LOCALES)}"
+            raise ValueError(message)
+        self.spec = spec
+        self.locales = list(LOCALES[: spec.locales])
+        self.root_locale = self.locales[0]
+        self.keys = [f"section{i % SECTIONS}-message{i}" for i in range(spec.keys)]
+
+        rng = random.Random(spec.seed)  # noqa: S311
+        kinds = [self._draw_kind(rng) for _ in self.keys]
+        self.locale_keys: dict[str, list[str]] = {self.root_locale: list(self.keys)}
+        for locale in self.locales[1:]:
+            self.locale_keys[locale] = [key for key in self.keys if rng.random() < spec.fallback_coverage]
+        self.texts = {
+            locale: "".join(self._message(locale, key, kind) for key, kind in zip(self.keys, kinds) if key in keys)
+            for locale, keys in ((locale, set(keys)) for locale, keys in self.locale_keys.items())
+        }
+
+    @property
+    def locales_map(self) -> dict[str, tuple[str, ...]]:
+        return {
+            locale: (locale,) if locale == self.root_locale else (locale, self.root_locale) for locale in self.locales
+        }
+
+    def fallback_keys(self, locale: str) -> list[str]:
+        """Keys, which the locale doesn't translate, served by the root locale."""
+        own_keys = set(self.locale_keys[locale])
+        return [key for key in self.keys if key not in own_keys]
+
+    def translators(self) -> list[FluentTranslator]:
+        return [
+            FluentTranslator(locale, FluentBundle.from_string(locale, text, use_isolating=False))
+            for locale, text in self.texts.items()
+        ]
+
+    def write(self, path: Path) -> Path:
+        """Write the catalog in the FileStorage layout: a directory per locale, a file per section."""
+        for locale, text in self.texts.items():
+            locale_path = path / locale
+            locale_path.mkdir(parents=True, exist_ok=True)
+            sections: dict[str, list[str]] = {}
+            for message in text.split("\n\n"):
+                if message:
+                    sections.setdefault(message.split("-", 1)[0], []).append(message)
+            for section, messages in sections.items():
+                (locale_path / f"{section}.ftl").write_text("\n\n".join(messages) + "\n", encoding="utf8")
+        return path
+
+    def _draw_kind(self, rng: random.Random) -> str:
+        draw = rng.random()
+        if draw < self.spec.select_ratio:
+            return "select"
+        if draw < self.spec.select_ratio + self.spec.placeable_ratio:
+            return "placeable"
+        return "static"
+
+    @staticmethod
+    def _message(locale: str, key: str, kind: str) -> str:
+        if kind == "select":
+            return (
+                f"{key} = {{ $count ->\n"
+                f"    [one] One item of {key} in {locale}\n"
+                f"   *[other] {{ $count }} items of {key} in {locale}\n"
+                f"}}\n\n"
+            )
+        if kind == "placeable":
+            return f"{key} = Hello, {{ $name }}! This is {key} in {locale}\n\n"
+        return f"{key} = This is {key} in {locale}\n\n"
@@ -0,0 +1,163 @@
+"""Timing of registered benchmarks, JSON results and comparison against a baseline"""
+
+from __future__ import annotations
+
+import json
+import platform
+import statistics
+import sys
+import time
+from collections.abc import Iterator
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any, Callable, NamedTuple
+
+from benchmarks.catalog import Catalog
+
+
+class Case(NamedTuple):
+    """A prepared operation, timed once per round. It performs ops operations, so results are per operation."""
+
+    operation: Callable[[], Any]
+    ops: int = 1
+
+
+class Skip(Exception):  # noqa: N818
+    """Raised by a benchmark, which can't run in the current environment, e.g. without an optional dependency."""
+
+
+# A generator yielding a single Case: code before the yield is the setup, and code after it is the teardown
+Benchmark = Callable[[Catalog], Iterator[Case]]
+
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str) -> Callable[[Benchmark], Benchmark]:
+    def register(function: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = function
+        return function
+
+    return register
+
+
+class Result(NamedTuple):
+    name: str
+    ops: int
+    # Seconds per operation of every round
+    rounds: list[float]
+
+    @property
+    def best(self) -> float:
+        return min(self.rounds)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.rounds)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"ops": self.ops, "rounds": self.rounds, "best": self.best, "median": self.median}
+
+
+def run_benchmark(name: str, catalog: Catalog, rounds: int, warmup: int = 1) -> Result:
+    cases = BENCHMARKS[name](catalog)
+    case = next(cases)
+    try:
+        for _ in range(warmup):
+            case.operation()
+        timings = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            case.operation()
+            timings.append((time.perf_counter() - started) / case.ops)
+    finally:
+        cases.close()
+    return Result(name, case.ops, timings)
+
+
+def run(
+    catalog: Catalog,
+    rounds: int = 5,
+    names: list[str] | None = None,
+    log: Callable[[str], Any] = print,
+) -> dict[str, Any]:
+    """Run benchmarks, all of them or those with given name prefixes, and return the JSON-ready report."""
+    results: dict[str, Any] = {}
+    skipped: dict[str, str] = {}
+    for name in BENCHMARKS:
+        if names and not any(name.startswith(prefix) for prefix in names):
+            continue
+        try:
+            result = run_benchmark(name, catalog, rounds)
+        except Skip as e:
+            skipped[name] = str(e)
+            log(f"{name:<40} skipped: {e}")
+            continue
+        results[name] = result.as_dict()
+        median, best = _format_seconds(result.median), _format_seconds(result.best)
+        log(f"{name:<40} {median:>12}/op  (best {best}, {result.ops} ops)")
+    return {"meta": _meta(catalog, rounds), "results": results, "skipped": skipped}
+
+
+def save(report: dict[str, Any], path: str | Path) -> None:
+    Path(path).write_text(json.dumps(report, indent=2) + "\n", encoding="utf8")
+
+
+def load(path: str | Path) -> dict[str, Any]:
+    return json.loads(Path(path).read_text(encoding="utf8"))
+
+
+class Change(NamedTuple):
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any]) -> list[Change]:
+    """Median times of benchmarks present in both reports."""
+    return [
+        Change(name, baseline["results"][name]["median"], result["median"])
+        for name, result in current["results"].items()
+        if name in baseline["results"]
+    ]
+
+
+def report_changes(changes: list[Change], threshold: float, log: Callable[[str], Any] = print) -> list[Change]:
+    """Print changes and return regressions, benchmarks slower than the baseline by more than threshold."""
+    regressions = []
+    for change in changes:
+        regressed = change.ratio > 1 + threshold
+        if regressed:
+            regressions.append(change)
+        mark = "REGRESSION" if regressed else ("faster" if change.ratio < 1 - threshold else "")
+        log(
+            f"{change.name:<40} {_format_seconds(change.baseline):>12} -> {_format_seconds(change.current):>12}"
+            f"  x{change.ratio:.2f} {mark}",
+        )
+    return regressions
+
+
+def _format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f}{unit}"
+    return f"{seconds / 1e-9:.0f}ns"
+
+
+def _meta(catalog: Catalog, rounds: int) -> dict[str, Any]:
+    try:
+        package_version = version("fluentogram")
+    except PackageNotFoundError:
+        package_version = None
+    return {
+        "fluentogram": package_version,
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "catalog": catalog.spec._asdict(),
+        "rounds": rounds,
+        "timestamp": time.time(),
+    }
@@ -10,6 +10,7 @@ else:
     from .nats.hub import KvTranslatorHub
     from .nats.storage import NatsStorage
 
+from .functions import FluentFunctions
 from .runner import TranslatorRunner
 from .transformers import DateTimeTransformer, MoneyTransformer
 from .translator import FluentTranslator
@@ -17,6 +18,7 @@ from .translator_hub import TranslatorHub
 
 __all__ = [
     "DateTimeTransformer",
+    "FluentFunctions",
     "FluentTranslator",
     "KvTranslatorHub",
     "MoneyTransformer",
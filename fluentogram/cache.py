@@ -0,0 +1,141 @@
+"""A bounded LRU cache of formatted messages"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Hashable, Mapping
+from datetime import date
+from decimal import Decimal
+from threading import Lock
+from typing import Any, NamedTuple
+
+CacheKey = tuple[str, str, frozenset]
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class FormatCache:
+    """Formatted output cache, keyed by (language, message key, kwargs).
+    Calls with unhashable kwargs are not cached. Entries are evicted in least-recently-used order,
+    and dropped for a whole message key when it is updated in the storage.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[CacheKey, str] = OrderedDict()
+        self._by_key: dict[str, set[CacheKey]] = {}
+        self._lock = Lock()
+
+    @staticmethod
+    def make_key(language: str, key: str, kwargs: Mapping[str, Any]) -> CacheKey | None:
+        """Build a cache key, or return None if kwargs can't be hashed."""
+        try:
+            return language, key, frozenset((name, _freeze(value)) for name, value in kwargs.items())
+        except TypeError:
+            return None
+
+    def get(self, cache_key: CacheKey) -> str | None:
+        with self._lock:
+            text = self._entries.get(cache_key)
+            if text is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(cache_key)
+            return text
+
+    def put(self, cache_key: CacheKey, text: str) -> None:
+        with self._lock:
+            self._entries[cache_key] = text
+            self._entries.move_to_end(cache_key)
+            self._by_key.setdefault(cache_key[1], set()).add(cache_key)
+            while len(self._entries) > self.maxsize:
+                evicted, _ = self._entries.popitem(last=False)
+                self._forget(evicted)
+
+    def invalidate(self, key: str) -> None:
+        """Drop all cached outputs of a message key, in every language."""
+        with self._lock:
+            for cache_key in self._by_key.pop(key, ()):
+                self._entries.pop(cache_key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_key.clear()
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(hits=self.hits, misses=self.misses, maxsize=self.maxsize, currsize=len(self._entries))
+
+    def _forget(self, cache_key: CacheKey) -> None:
+        keys = self._by_key.get(cache_key[1])
+        if keys is not None:
+            keys.discard(cache_key)
+            if not keys:
+                del self._by_key[cache_key[1]]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _freeze(value: Any) -> Hashable:
+    # Fluent types (FluentNumber, FluentDateType) compare equal regardless of their formatting options
+    options = getattr(value, "options", None)
+    if options is not None:
+        return type(value), value, str(value), repr(options)
+    if isinstance(value, (float, Decimal, date)):
+        # Equal values may still be formatted differently: Decimal("1") and Decimal("1.00"), or the same moment
+        # in different time zones
+        return type(value), value, str(value)
+    return type(value), value
+
+
+class MissingKeys:
+    """Negative cache of message keys missing in a whole fallback chain, with counts of their lookups.
+    Lookups of known missing keys skip translators entirely. A key is dropped as soon as it is added to the storage.
+    At most maxsize keys are remembered, so dynamically built keys can't grow it without bound.
+    """
+
+    def __init__(self, maxsize: int = 10_000) -> None:
+        self.maxsize = maxsize
+        # Lookups of keys, which were already known to be missing
+        self.repeated = 0
+        self._counts: dict[str, int] = {}
+        self._lock = Lock()
+
+    def hit(self, key: str) -> None:
+        """Count a lookup of a missing key, remembering it if there is room."""
+        with self._lock:
+            count = self._counts.get(key)
+            if count is not None:
+                self.repeated += 1
+                self._counts[key] = count + 1
+            elif len(self._counts) < self.maxsize:
+                self._counts[key] = 1
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._counts.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+    def most_common(self, n: int | None = None) -> list[tuple[str, int]]:
+        """Missing keys with counts of their lookups, the most looked up first."""
+        with self._lock:
+            counts = sorted(self._counts.items(), key=lambda item: item[1], reverse=True)
+        return counts if n is None else counts[:n]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._counts
+
+    def __len__(self) -> int:
+        return len(self._counts)
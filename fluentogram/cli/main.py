@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import time
 from pathlib import Path
 
@@ -56,6 +57,27 @@ def watch_files(output_file: str, file_path: str | None, dir_path: str | None) -
     observer.join()
 
 
+def push_files(args: argparse.Namespace) -> None:
+    """Push translations of a locales directory to a NATS KV bucket, putting changed values only."""
+    # nats-py is an optional dependency
+    from fluentogram.nats.bulk import push
+
+    result = asyncio.run(
+        push(
+            args.path,
+            servers=args.servers or ["nats://localhost:4222"],
+            bucket=args.bucket,
+            separator=args.separator,
+            concurrency=args.concurrency,
+            create=args.create,
+        ),
+    )
+    print(
+        f"Pushed {result.changed} of {result.total} translations in {result.seconds:.2f}s "
+        f"({result.throughput:.0f} puts/s)",
+    )
+
+
 def cli() -> None:
     parser = argparse.ArgumentParser(prog="fluentogram")
     parser.add_argument("-o", "--output-file", dest="output_file", required=False, help="Path to the output file")
@@ -75,8 +97,31 @@ def cli() -> None:
     parser.add_argument("-dir-ftl", dest="dir_path", required=False, help="Path to the directory to watch")
     parser.add_argument("-stub", dest="output_file", required=False, help="Path to the output file")
 
+    subparsers = parser.add_subparsers(dest="command")
+    push_parser = subparsers.add_parser("push", help="Push translations of a locales directory to NATS KV")
+    push_parser.add_argument("path", help="Path to the locales directory, in FileStorage layout")
+    push_parser.add_argument(
+        "-s",
+        "--server",
+        dest="servers",
+        action="append",
+        help="NATS server URL, may be repeated. nats://localhost:4222 by default",
+    )
+    push_parser.add_argument("-b", "--bucket", default="fluentogram", help="Name of the KV bucket")
+    push_parser.add_argument("--separator", default=".", help="Separator of locale and key in KV keys")
+    push_parser.add_argument("-c", "--concurrency", type=int, default=64, help="Number of puts in flight at once")
+    push_parser.add_argument(
+        "--create",
+        action="store_true",
+        help="Create the bucket with the default config if it doesn't exist. Existing buckets are opened as they are",
+    )
+
     args = parser.parse_args()
 
+    if args.command == "push":
+        push_files(args)
+        return
+
     if not args.output_file:
         args.output_file = "fluentogram.pyi"
 
@@ -0,0 +1,176 @@
+"""A registry of custom Fluent functions, compiled into bundles of storages"""
+
+from __future__ import annotations
+
+import functools
+import re
+from collections import OrderedDict
+from collections.abc import Hashable, Mapping
+from contextvars import ContextVar
+from threading import Lock
+from typing import Any, Callable, NamedTuple, TypeVar
+
+from fluent_compiler.builtins import BUILTINS
+
+from fluentogram.cache import CacheInfo, _freeze
+
+T = TypeVar("T")
+FluentFunction = Callable[..., Any]
+
+# Fluent syntax of function names
+_FUNCTION_NAME = re.compile(r"[A-Z][A-Z0-9_-]*")
+# Calls of impure functions made while rendering, None when nobody is tracking them
+_impure_calls: ContextVar[list[str] | None] = ContextVar("fluentogram_impure_calls", default=None)
+
+
+class _Registered(NamedTuple):
+    # The function as registered, used for compilation. It is picklable if it is importable by name
+    function: FluentFunction
+    # The function called by compiled messages: memoized, or tracked as impure
+    runtime: FluentFunction
+
+
+class FluentFunctions:
+    """Custom functions, callable from messages as { NAME($arg, option: "value") }, next to NUMBER and DATETIME.
+    Pass the registry to FileStorage or TranslatorHub before catalogs are compiled, so bundles and updates
+    are compiled with it. Functions get Fluent values (str, FluentNumber, FluentDateType) and return any of them.
+
+    Functions are impure by default: messages calling them without arguments are never prerendered,
+    and their output is never put into the format cache. Register deterministic functions with pure=True,
+    or with memoize=True to also cache their results, keyed by arguments, in a bounded LRU.
+    """
+
+    def __init__(self, functions: Mapping[str, FluentFunction] | None = None) -> None:
+        self._functions: dict[str, _Registered] = {}
+        for name, function in (functions or {}).items():
+            self.add(name, function)
+
+    def add(
+        self,
+        name: str,
+        function: FluentFunction,
+        pure: bool = False,  # noqa: FBT002
+        memoize: bool | int = False,  # noqa: FBT002
+    ) -> None:
+        """Register a function under a Fluent name. memoize is True for 1024 cached results, or their number."""
+        if not _FUNCTION_NAME.fullmatch(name):
+            message = f"Invalid Fluent function name: {name!r}"
+            raise ValueError(message)
+
+        if memoize:
+            runtime = _MemoizedFunction(function, 1024 if memoize is True else memoize)
+        elif pure:
+            runtime = function
+        else:
+            runtime = _tracked(function, name)
+        self._functions[name] = _Registered(function, runtime)
+
+    def register(
+        self,
+        name: str | None = None,
+        pure: bool = False,  # noqa: FBT002
+        memoize: bool | int = False,  # noqa: FBT002
+    ) -> Callable[[T], T]:
+        """Decorator form of add(). The name defaults to the upper-cased name of the function."""
+
+        def decorator(function: T) -> T:
+            self.add(name or function.__name__.upper(), function, pure=pure, memoize=memoize)
+            return function
+
+        return decorator
+
+    def names(self) -> list[str]:
+        return sorted(self._functions)
+
+    def compile_functions(self) -> dict[str, FluentFunction]:
+        """Functions for the compiler, built-in ones included. Only their signatures are inspected."""
+        functions = BUILTINS.copy()
+        functions.update({name: registered.function for name, registered in self._functions.items()})
+        return functions
+
+    def bundle_functions(self) -> dict[str, FluentFunction]:
+        """Functions to be called by compiled messages, e.g. FluentBundle.from_string(..., functions=...)."""
+        functions = BUILTINS.copy()
+        functions.update({name: registered.runtime for name, registered in self._functions.items()})
+        return functions
+
+    def cache_info(self, name: str) -> CacheInfo | None:
+        """Statistics of a memoized function, None if it isn't memoized."""
+        runtime = self._functions[name].runtime
+        return runtime.cache_info() if isinstance(runtime, _MemoizedFunction) else None
+
+    def cache_clear(self) -> None:
+        """Drop cached results of all memoized functions."""
+        for registered in self._functions.values():
+            if isinstance(registered.runtime, _MemoizedFunction):
+                registered.runtime.cache_clear()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._functions
+
+    def __repr__(self) -> str:
+        return f"<fluentogram.FluentFunctions {self.names()}>"
+
+
+def track_impure_calls(render: Callable[[], T]) -> tuple[T, bool]:
+    """Call render, and tell if it has called any impure function, so its result can't be reused."""
+    calls: list[str] = []
+    token = _impure_calls.set(calls)
+    try:
+        result = render()
+    finally:
+        _impure_calls.reset(token)
+    return result, bool(calls)
+
+
+def _tracked(function: FluentFunction, name: str) -> FluentFunction:
+    @functools.wraps(function)
+    def tracked(*args: Any, **kwargs: Any) -> Any:
+        calls = _impure_calls.get()
+        if calls is not None:
+            calls.append(name)
+        return function(*args, **kwargs)
+
+    return tracked
+
+
+class _MemoizedFunction:
+    """A function with results cached by arguments. Calls with unhashable arguments aren't cached."""
+
+    def __init__(self, function: FluentFunction, maxsize: int) -> None:
+        # Copies ftl_arg_spec and sets __wrapped__, so the compiler inspects arguments of the function itself
+        functools.update_wrapper(self, function)
+        self._function = function
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._results: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = Lock()
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        try:
+            key = (tuple(map(_freeze, args)), frozenset((name, _freeze(value)) for name, value in kwargs.items()))
+            hash(key)
+        except TypeError:
+            return self._function(*args, **kwargs)
+
+        with self._lock:
+            if key in self._results:
+                self.hits += 1
+                self._results.move_to_end(key)
+                return self._results[key]
+            self.misses += 1
+        # Called outside of the lock, so concurrent misses may call the function twice, but never block each other
+        result = self._function(*args, **kwargs)
+        with self._lock:
+            self._results[key] = result
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+        return result
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(hits=self.hits, misses=self.misses, maxsize=self.maxsize, currsize=len(self._results))
+
+    def cache_clear(self) -> None:
+        with self._lock:
+            self._results.clear()
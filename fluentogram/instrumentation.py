@@ -0,0 +1,104 @@
+"""Opt-in instrumentation of translation calls"""
+
+from __future__ import annotations
+
+import heapq
+import random
+from collections.abc import Sequence
+from threading import Lock
+from typing import Callable, NamedTuple
+
+from fluentogram.exceptions import FormatError, KeyNotFoundError
+from fluentogram.metrics import FORMAT_TIME_BOUNDS, Histogram, HistogramSnapshot
+
+
+class CallRecord(NamedTuple):
+    language: str
+    key: str
+    seconds: float
+    # Position of the translator serving the key in the fallback chain, None if no translator has it
+    depth: int | None
+    error: Exception | None
+
+
+class InstrumentationSnapshot(NamedTuple):
+    # Sampled calls by (language, key)
+    calls: dict[tuple[str, str], int]
+    # Sampled calls by the fallback depth which served them
+    fallback_depth: dict[int, int]
+    format_time: HistogramSnapshot
+    format_errors: int
+    key_not_found: int
+    # (language, key, seconds) of the slowest sampled call of the slowest keys, the slowest first
+    slowest: list[tuple[str, str, float]]
+
+
+class Instrumentation:
+    """Collects call counts, fallback depths, format time and errors of translation calls.
+    Only a sample_rate share of calls is measured and counted, so divide counts by it to estimate totals.
+    Every measured call is also passed to listeners, see add_listener().
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 1.0,
+        top_n: int = 10,
+        bounds: Sequence[float] = FORMAT_TIME_BOUNDS,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.top_n = top_n
+        self._bounds = bounds
+        self._listeners: list[Callable[[CallRecord], None]] = []
+        self._lock = Lock()
+        self.reset()
+
+    def sample(self) -> bool:
+        """Decide if the current call is measured."""
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate  # noqa: S311
+
+    def record(self, record: CallRecord) -> None:
+        with self._lock:
+            call = (record.language, record.key)
+            self._calls[call] = self._calls.get(call, 0) + 1
+            if record.depth is not None:
+                self._fallback_depth[record.depth] = self._fallback_depth.get(record.depth, 0) + 1
+            if isinstance(record.error, FormatError):
+                self._format_errors += 1
+            elif isinstance(record.error, KeyNotFoundError):
+                self._key_not_found += 1
+            if record.seconds > self._slowest.get(call, 0.0):
+                self._slowest[call] = record.seconds
+        self._format_time.observe(record.seconds)
+        for listener in self._listeners:
+            listener(record)
+
+    def add_listener(self, listener: Callable[[CallRecord], None]) -> None:
+        """Register a callback, called with a CallRecord of every measured call."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[CallRecord], None]) -> None:
+        """Unregister a callback registered by add_listener."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def snapshot(self) -> InstrumentationSnapshot:
+        with self._lock:
+            slowest = heapq.nlargest(self.top_n, self._slowest.items(), key=lambda item: item[1])
+            return InstrumentationSnapshot(
+                calls=dict(self._calls),
+                fallback_depth=dict(self._fallback_depth),
+                format_time=self._format_time.snapshot(),
+                format_errors=self._format_errors,
+                key_not_found=self._key_not_found,
+                slowest=[(language, key, seconds) for (language, key), seconds in slowest],
+            )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._calls: dict[tuple[str, str], int] = {}
+            self._fallback_depth: dict[int, int] = {}
+            self._format_time = Histogram(self._bounds)
+            self._format_errors = 0
+            self._key_not_found = 0
+            self._slowest: dict[tuple[str, str], float] = {}
@@ -0,0 +1,151 @@
+"""Bulk seeding of a NATS KV bucket from FTL files"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Callable, NamedTuple
+
+from fluent.syntax import FluentParser, FluentSerializer
+from fluent.syntax.ast import Message, Term
+from nats import connect
+from nats.aio.msg import Msg
+from nats.js import JetStreamContext
+from nats.js.api import DeliverPolicy, KeyValueConfig
+from nats.js.errors import BucketNotFoundError
+from nats.js.kv import KV_DEL, KV_OP, KV_PURGE, KeyValue
+
+from fluentogram.storage.file import FileStorage
+
+_JsonDumps = Callable[..., bytes]
+
+
+class BulkPutResult(NamedTuple):
+    # Number of translations compared with the bucket
+    total: int
+    # Number of translations put, because their values differ from the bucket
+    changed: int
+    seconds: float
+
+    @property
+    def throughput(self) -> float:
+        """Puts per second."""
+        return self.changed / self.seconds if self.seconds else 0.0
+
+
+def read_translations(path: str | Path) -> dict[str, dict[str, str]]:
+    """Read messages and terms of every locale in a directory of FileStorage layout, as values NatsKvStorage expects.
+    Terms are keyed like "-brand", NatsKvStorage compiles every message of a locale with its terms.
+    """
+    translations: dict[str, dict[str, str]] = {}
+    serializer = FluentSerializer()
+    for locale, text in FileStorage.read_locales(path).items():
+        messages = translations.setdefault(locale, {})
+        for entry in FluentParser().parse(text).body:
+            if not isinstance(entry, (Message, Term)):
+                continue
+            key = entry.id.name if isinstance(entry, Message) else f"-{entry.id.name}"
+            if key not in messages:
+                # Everything after "key =", so "key = value" compiles back to the same message.
+                # The entry is serialized without its comment, which would come first
+                source = serializer.serialize_entry(type(entry)(entry.id, entry.value, entry.attributes))
+                messages[key] = source[len(key) + 2 :].lstrip(" ").rstrip("\n")
+    return translations
+
+
+async def read_bucket(kv: KeyValue, js: JetStreamContext) -> dict[str, bytes]:
+    """Read the latest value of every key in the bucket, with a temporary ordered consumer."""
+    stream_name = kv._stream  # noqa: SLF001
+    prefix = f"${stream_name.replace('_', '.', 1)}."
+    values: dict[str, bytes] = {}
+    delivered = asyncio.Event()
+
+    async def on_message(msg: Msg) -> None:
+        key = msg.subject[len(prefix) :]
+        if msg.headers is not None and msg.headers.get(KV_OP) in (KV_DEL, KV_PURGE):
+            values.pop(key, None)
+        else:
+            values[key] = msg.data
+        if msg.metadata.num_pending == 0:
+            delivered.set()
+
+    subscription = await js.subscribe(
+        f"{prefix}>",
+        stream=stream_name,
+        cb=on_message,
+        ordered_consumer=True,
+        deliver_policy=DeliverPolicy.LAST_PER_SUBJECT,
+    )
+    try:
+        if (await subscription.consumer_info()).num_pending == 0 and not values:
+            # The bucket is empty
+            delivered.set()
+        await delivered.wait()
+    finally:
+        await subscription.unsubscribe()
+    return values
+
+
+async def bulk_put(  # noqa: PLR0913
+    kv: KeyValue,
+    js: JetStreamContext,
+    translations: Mapping[str, Mapping[str, str]],
+    separator: str = ".",
+    serializer: _JsonDumps = lambda data: json.dumps(data).encode("utf-8"),
+    concurrency: int = 64,
+) -> BulkPutResult:
+    """Put translations by locale to the bucket, skipping values it already has.
+    Up to `concurrency` puts are in flight at once, instead of waiting for every acknowledgement in turn.
+    """
+    started = time.perf_counter()
+    current = await read_bucket(kv, js)
+    total = 0
+    changed: list[tuple[str, bytes]] = []
+    for locale, messages in translations.items():
+        for key, value in messages.items():
+            total += 1
+            kv_key = f"{locale}{separator}{key}"
+            data = serializer(value)
+            if current.get(kv_key) != data:
+                changed.append((kv_key, data))
+
+    pending = iter(changed)
+
+    async def put_pending() -> None:
+        # Workers share the iterator, so every put is made once
+        for kv_key, data in pending:
+            await kv.put(kv_key, data)
+
+    await asyncio.gather(*(put_pending() for _ in range(min(concurrency, len(changed)))))
+    return BulkPutResult(total=total, changed=len(changed), seconds=time.perf_counter() - started)
+
+
+async def push(  # noqa: PLR0913
+    path: str | Path,
+    servers: list[str],
+    bucket: str,
+    separator: str = ".",
+    concurrency: int = 64,
+    create: bool = False,  # noqa: FBT002
+    **connect_options: Any,
+) -> BulkPutResult:
+    """Connect to NATS and put translations of a directory of FileStorage layout to the bucket.
+    The bucket has to exist, unless create is set: then a missing bucket is created with the default config.
+    """
+    translations = read_translations(path)
+    nc = await connect(servers=servers, **connect_options)
+    try:
+        js = nc.jetstream()
+        try:
+            # An existing bucket is opened as it is: creating it again fails, if its config differs from the default
+            kv = await js.key_value(bucket)
+        except BucketNotFoundError:
+            if not create:
+                raise
+            kv = await js.create_key_value(config=KeyValueConfig(bucket=bucket))
+        return await bulk_put(kv, js, translations, separator, concurrency=concurrency)
+    finally:
+        await nc.close()
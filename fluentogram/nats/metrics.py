@@ -0,0 +1,120 @@
+"""Replication metrics of NatsKvStorage"""
+
+from __future__ import annotations
+
+from typing import Callable, NamedTuple
+
+from fluentogram.metrics import LATENCY_BOUNDS, SIZE_BOUNDS, Histogram, HistogramSnapshot
+
+
+class BatchStats(NamedTuple):
+    """A batch of changes applied by the listener, passed to batch listeners."""
+
+    size: int
+    compile_seconds: float
+    # Seconds between publishing and application of every change, empty for the initial snapshot of the bucket
+    latencies: tuple[float, ...]
+    applied_sequence: int
+    head_sequence: int
+    errors: int
+
+
+class NatsKvStats(NamedTuple):
+    # Stream sequence of the last applied change
+    applied_sequence: int
+    # Estimated head of the stream: the last delivered sequence, plus changes pending on the server
+    head_sequence: int
+    # Changes delivered to the listener, but not applied yet
+    received: int
+    # Changes not delivered to the listener yet, as reported by the server with the last delivered one
+    pending: int
+    changes_applied: int
+    batches_applied: int
+    errors: int
+    apply_latency: HistogramSnapshot
+    batch_size: HistogramSnapshot
+    compile_seconds: HistogramSnapshot
+
+    @property
+    def lag(self) -> int:
+        """Number of changes the replica is behind the stream."""
+        return self.received + self.pending
+
+
+class NatsKvMetrics:
+    """Counters and histograms of the NatsKvStorage listener.
+    Read them with NatsKvStorage.stats(), or get every applied batch with add_batch_listener().
+    """
+
+    def __init__(self) -> None:
+        self.applied_sequence = 0
+        self.delivered_sequence = 0
+        self.changes_applied = 0
+        self.batches_applied = 0
+        self.errors = 0
+        self.apply_latency = Histogram(LATENCY_BOUNDS)
+        self.batch_size = Histogram(SIZE_BOUNDS)
+        self.compile_seconds = Histogram(LATENCY_BOUNDS)
+        self._batch_compile_seconds = 0.0
+        self._batch_errors = 0
+        self._batch_listeners: list[Callable[[BatchStats], None]] = []
+
+    def add_batch_listener(self, listener: Callable[[BatchStats], None]) -> None:
+        """Register a callback, called with BatchStats after every applied batch."""
+        if listener not in self._batch_listeners:
+            self._batch_listeners.append(listener)
+
+    def remove_batch_listener(self, listener: Callable[[BatchStats], None]) -> None:
+        """Unregister a callback registered by add_batch_listener."""
+        if listener in self._batch_listeners:
+            self._batch_listeners.remove(listener)
+
+    def delivered(self, sequence: int) -> None:
+        self.delivered_sequence = max(self.delivered_sequence, sequence)
+
+    def compiled(self, seconds: float, errors: int = 0) -> None:
+        """Account compilation of a part of the current batch."""
+        self._batch_compile_seconds += seconds
+        self._batch_errors += errors
+
+    def failed(self) -> None:
+        """Account an error, which dropped the rest of the current batch."""
+        self._batch_errors += 1
+
+    def batch_applied(self, size: int, sequence: int, latencies: tuple[float, ...]) -> BatchStats:
+        batch = BatchStats(
+            size=size,
+            compile_seconds=self._batch_compile_seconds,
+            latencies=latencies,
+            applied_sequence=max(self.applied_sequence, sequence),
+            head_sequence=self.delivered_sequence,
+            errors=self._batch_errors,
+        )
+        self._batch_compile_seconds = 0.0
+        self._batch_errors = 0
+
+        self.applied_sequence = batch.applied_sequence
+        self.changes_applied += size
+        self.batches_applied += 1
+        self.errors += batch.errors
+        self.batch_size.observe(size)
+        self.compile_seconds.observe(batch.compile_seconds)
+        for latency in latencies:
+            self.apply_latency.observe(latency)
+        for listener in self._batch_listeners:
+            listener(batch)
+        return batch
+
+    def snapshot(self, received: int, pending: int) -> NatsKvStats:
+        return NatsKvStats(
+            applied_sequence=self.applied_sequence,
+            head_sequence=max(self.delivered_sequence + pending, self.applied_sequence),
+            received=received,
+            pending=pending,
+            changes_applied=self.changes_applied,
+            batches_applied=self.batches_applied,
+            errors=self.errors,
+            apply_latency=self.apply_latency.snapshot(),
+            batch_size=self.batch_size.snapshot(),
+            compile_seconds=self.compile_seconds.snapshot(),
+        )
@@ -3,17 +3,27 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import time
 from collections import defaultdict
+from collections.abc import Iterable, Mapping
+from concurrent.futures import Executor
 from contextlib import suppress
 from typing import Any, Callable
 
+from fluent.syntax import FluentParser
+from fluent.syntax.ast import Message, Term
+from fluent_compiler.utils import ATTRIBUTE_SEPARATOR, TERM_SIGIL
 from nats import connect
 from nats.aio.msg import Msg
 from nats.js import JetStreamContext
-from nats.js.api import KeyValueConfig
+from nats.js.api import DeliverPolicy, KeyValueConfig
 from nats.js.kv import KV_DEL, KV_OP, KV_PURGE, KeyValue
 
+from fluentogram.nats.bulk import BulkPutResult, bulk_put
+from fluentogram.nats.metrics import NatsKvMetrics, NatsKvStats
 from fluentogram.storage.base import BaseStorage
+from fluentogram.storage.watch import entry_references, with_dependents, with_referenced
+from fluentogram.translator import FluentTranslator
 
 _JsonLoads = Callable[..., Any]
 _JsonDumps = Callable[..., bytes]
@@ -30,7 +40,18 @@ class NatsKvStorage(BaseStorage):
         serializer: _JsonDumps = lambda data: json.dumps(data).encode("utf-8"),
         deserializer: _JsonLoads = json.loads,
         consume_timeout: float = 1.0,
+        debounce: float = 0.0,
+        executor: Executor | None = None,
+        locales: Iterable[str] | None = None,
     ) -> None:
+        """debounce: seconds to collect further changes after one arrives, before compiling them all at once.
+        executor: thread pool compiling received changes off the event loop, the loop's default one if None.
+        Message functions can't cross a process boundary, so a process pool can't be used here.
+        locales: locales to receive changes of, besides locales of translators in the storage.
+        The server only sends changes of these locales. While there are none, changes of all locales are received,
+        and kept until subscriptions narrow to served locales. Pass locales to filter changes from the start.
+        """
+        super().__init__()
         self._js = js
         self._nc = js._nc  # noqa: SLF001
         self._kv = kv
@@ -38,25 +59,82 @@ class NatsKvStorage(BaseStorage):
         self.separator = separator
         self.serializer = serializer
         self.deserializer = deserializer
+        # Kept for backward compatibility, changes are pushed by the server instead of polling
         self.consume_timeout = consume_timeout
+        self.debounce = debounce
+        # Seconds to wait before subscribing again, after subscribing to changes of a locale has failed
+        self.sync_retry_delay = 1.0
+        self._executor = executor
+        # Values received for locales, which have no translator in the storage yet
+        self._pending_translations: dict[str, dict[str, str]] = {}
+        # Values received for locales of translators. Terms are compiled with every batch, and messages are
+        # compiled again when a term changes, so messages always reference current terms of the bucket
+        self._values: dict[str, dict[str, str]] = {}
+        # Ids referenced by values of a locale, parsed on the first change of its terms and kept along with values
+        self._references: dict[str, dict[str, frozenset[str]]] = {}
+        self._locales = frozenset(locales or ())
+        # Subscribed locale -> its consumer, None stands for a consumer of all locales
+        self._subscriptions: dict[str | None, JetStreamContext.PushSubscription] = {}
+        # Subscribed locale -> number of its messages not delivered by the server yet
+        self._server_pending: dict[str | None, int] = {}
+        self._received: list[Msg] = []
+        self._received_event = asyncio.Event()
+        self._ready_event = asyncio.Event()
+        self._stop_event = asyncio.Event()
+        # Seconds between publishing of the last applied change and its application
+        self.last_apply_latency: float | None = None
+        self.metrics = NatsKvMetrics()
         self._listen_for_changes_task: asyncio.Task | None = None
         self._listen_for_changes_task = asyncio.create_task(self.listen_for_changes())
-        self._stop_event = asyncio.Event()
-        super().__init__()
 
     @classmethod
-    async def from_servers(
+    async def from_servers(  # noqa: PLR0913
         cls,
         servers: list[str],
         kv_config: KeyValueConfig,
         separator: str = ".",
         serializer: _JsonDumps = lambda data: json.dumps(data).encode("utf-8"),
         deserializer: _JsonLoads = json.loads,
+        consume_timeout: float = 1.0,
+        sync: bool = False,  # noqa: FBT002
+        debounce: float = 0.0,
+        locales: Iterable[str] | None = None,
     ) -> NatsKvStorage:
+        """Connect to NATS and create the storage.
+        With sync=True, returns only after the current values of the bucket are loaded, see ready().
+        """
         nc = await connect(servers=servers)
         js = nc.jetstream()
         kv = await js.create_key_value(config=kv_config)
-        return cls(kv, js, separator, serializer, deserializer)
+        storage = cls(kv, js, separator, serializer, deserializer, consume_timeout, debounce=debounce, locales=locales)
+        if sync:
+            await storage.ready()
+        return storage
+
+    async def ready(self) -> None:
+        """Wait until the latest value of every key in the bucket is applied locally."""
+        if self._ready_event.is_set() or self._listen_for_changes_task is None:
+            return
+
+        ready = asyncio.ensure_future(self._ready_event.wait())
+        await asyncio.wait((ready, self._listen_for_changes_task), return_when=asyncio.FIRST_COMPLETED)
+        if not ready.done():
+            ready.cancel()
+            # The listener has stopped before the initial sync, so raise its error
+            self._listen_for_changes_task.result()
+
+    def add_translator(self, translator: FluentTranslator) -> None:
+        """Add a translator to storage, applying values already received for its locale.
+        If changes of the locale aren't received yet, the listener subscribes to them.
+        """
+        super().add_translator(translator)
+        if translator.locale not in self._subscriptions:
+            self._received_event.set()
+        pending = self._pending_translations.pop(translator.locale, None)
+        if pending:
+            self._values[translator.locale] = pending
+            messages, terms = _split_terms(pending)
+            translator.apply(_compile_translations(translator, messages, terms))
 
     async def update_translation(
         self,
@@ -67,61 +145,235 @@ class NatsKvStorage(BaseStorage):
         """Put translation to NATS KV store."""
         await self._kv.put(f"{locale}{self.separator}{key}", self.serializer(value))
 
-    async def _create_consumer(self) -> JetStreamContext.PullSubscription:
+    async def update_translations(self, locale: str, translations: dict[str, str]) -> None:
+        """Put several translations to NATS KV store.
+        The listener applies them to local translators in batches, compiling each batch once.
+        """
+        await asyncio.gather(*(self.update_translation(locale, key, value) for key, value in translations.items()))
+
+    async def bulk_put(
+        self,
+        translations: Mapping[str, Mapping[str, str]],
+        concurrency: int = 64,
+    ) -> BulkPutResult:
+        """Put translations by locale to NATS KV store, skipping values the bucket already has.
+        Puts are pipelined, up to `concurrency` at once. See fluentogram.nats.bulk.read_translations
+        to read translations from a directory of FileStorage layout.
+        """
+        return await bulk_put(self._kv, self._js, translations, self.separator, self.serializer, concurrency)
+
+    async def delete_translation(self, locale: str, key: str) -> None:
+        """Delete translation from NATS KV store, the listener restores its original value."""
+        await self._kv.delete(f"{locale}{self.separator}{key}")
+
+    async def delete_translations(self, locale: str, keys: Iterable[str]) -> None:
+        """Delete several translations from NATS KV store.
+        The listener restores original values of every batch of deletes at once, without recompilation.
+        """
+        await asyncio.gather(*(self.delete_translation(locale, key) for key in keys))
+
+    def _subscribed_locales(self) -> set[str | None]:
+        """Locales to receive changes of, None stands for all of them."""
+        if self.separator != ".":
+            # KV keys with another separator are single subject tokens, so they can't be filtered by locale
+            return {None}
+        return set(self._locales | self._storage.keys()) or {None}
+
+    async def _sync_subscriptions(self) -> None:
+        """Subscribe to changes of new locales, and unsubscribe from changes of no longer served ones."""
+        locales = self._subscribed_locales()
+        # New consumers are created first, so if that fails, changes are still received by the current ones
+        for locale in locales - self._subscriptions.keys():
+            self._subscriptions[locale] = subscription = await self._create_consumer(locale)
+            if locale not in self._server_pending:
+                self._server_pending[locale] = (await subscription.consumer_info()).num_pending
+        for locale in self._subscriptions.keys() - locales:
+            self._server_pending.pop(locale, None)
+            with suppress(Exception):
+                await self._subscriptions.pop(locale).unsubscribe()
+        if None not in locales:
+            # Values received from the consumer of all locales, which will never be served
+            for locale in self._pending_translations.keys() - locales:
+                del self._pending_translations[locale]
+
+    async def _try_sync_subscriptions(self) -> bool:
+        """Sync subscriptions, keeping the current ones if that fails. Returns whether all of them are synced."""
+        try:
+            await self._sync_subscriptions()
+        except Exception:
+            logger.exception("Error in listen_for_changes while subscribing to changes")
+            return False
+        return True
+
+    async def _create_consumer(self, locale: str | None = None) -> JetStreamContext.PushSubscription:
         stream = await self._js.stream_info(self._stream_name)
         stream_name = stream.config.name
         if stream_name is None:
             raise ValueError("Stream name is None")
         subject_name = stream_name.replace("_", self.separator, 1)
-        subject = f"${subject_name}.>"
-        return await self._js.pull_subscribe(subject=subject, stream=stream_name)
+        subject = f"${subject_name}.>" if locale is None else f"${subject_name}.{locale}.>"
 
-    async def _process_messages(self, consumer: JetStreamContext.PullSubscription) -> None:
-        """Process messages from the consumer."""
-        try:
-            messages: list[Msg] = await consumer.fetch(50, timeout=self.consume_timeout)
-            if not messages:
-                return
-            logger.debug("Received %d messages: %s", len(messages), messages)
-            await self._update_compiled_messages(messages)
-        except TimeoutError:
-            pass
-        except Exception as e:
-            if not self._stop_event.is_set():
-                logger.exception("Error in listen_for_changes: %s", exc_info=e)
+        async def on_message(msg: Msg) -> None:
+            self._server_pending[locale] = msg.metadata.num_pending
+            await self._on_message(msg)
+
+        # An ordered push consumer is ephemeral, flow-controlled by the client and needs no acks.
+        # Every key is delivered once with its latest value first, then new changes are pushed as they arrive
+        return await self._js.subscribe(
+            subject,
+            stream=stream_name,
+            cb=on_message,
+            ordered_consumer=True,
+            deliver_policy=DeliverPolicy.LAST_PER_SUBJECT,
+        )
+
+    async def _on_message(self, msg: Msg) -> None:
+        self.metrics.delivered(msg.metadata.sequence.stream)
+        self._received.append(msg)
+        self._received_event.set()
+
+    def _snapshot_delivered(self) -> bool:
+        return not any(self._server_pending.values())
 
     async def listen_for_changes(self) -> None:
         """Listen for changes in NATS KV store and update local storage."""
-        consumer = await self._create_consumer()
-        while not self._stop_event.is_set():
-            await self._process_messages(consumer)
+        try:
+            synced = await self._try_sync_subscriptions()
+            if synced and self._snapshot_delivered() and not self._received:
+                # The bucket is empty, nothing to sync
+                self._ready_event.set()
+
+            while not self._stop_event.is_set():
+                if synced:
+                    await self._received_event.wait()
+                else:
+                    # Wait for changes received by current consumers, or the next attempt to subscribe
+                    with suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(self._received_event.wait(), self.sync_retry_delay)
+                synced = await self._try_sync_subscriptions()
+                if self.debounce > 0 and self._ready_event.is_set():
+                    # Let a burst of changes accumulate, so it is compiled once
+                    await asyncio.sleep(self.debounce)
+                self._received_event.clear()
+                await self._apply_received()
+        finally:
+            for subscription in self._subscriptions.values():
+                with suppress(Exception):
+                    await subscription.unsubscribe()
+            self._subscriptions.clear()
+
+    async def _apply_received(self) -> None:
+        """Apply all messages received since the last call."""
+        if not self._received:
+            return
+        if not self._ready_event.is_set() and not self._snapshot_delivered():
+            # The snapshot of the bucket isn't fully delivered yet, it is applied later as a single batch
+            return
+
+        messages, self._received = self._received, []
+        logger.debug("Received %d messages", len(messages))
+        try:
+            await self._update_compiled_messages(messages)
+        except Exception:
+            logger.exception("Error in listen_for_changes")
+            self.metrics.failed()
+
+        latencies: tuple[float, ...] = ()
+        if self._ready_event.is_set():
+            applied_at = time.time()
+            latencies = tuple(applied_at - m.metadata.timestamp.timestamp() for m in messages)
+            self.last_apply_latency = latencies[-1]
+        self._ready_event.set()
+        self.metrics.batch_applied(
+            len(messages),
+            max(m.metadata.sequence.stream for m in messages),
+            latencies,
+        )
+
+    def stats(self) -> NatsKvStats:
+        """Replication metrics of the listener: applied versus known stream sequence, latencies, batches, errors."""
+        return self.metrics.snapshot(received=len(self._received), pending=sum(self._server_pending.values()))
 
     async def _update_compiled_messages(self, messages: list[Msg]) -> None:
-        """Update compiled messages based on NATS KV changes."""
-        changes = defaultdict(list)
+        """Update compiled messages based on NATS KV changes.
+        Changes are coalesced, so only the last value of every key is compiled, or the key is deleted.
+        """
+        # None stands for a deleted key
+        changes: defaultdict[str, dict[str, str | None]] = defaultdict(dict)
         for m in messages:
             kind = m.headers.get(KV_OP) if m.headers is not None else None
             *_, locale, key = m.subject.split(self.separator)
-            if kind in (KV_DEL, KV_PURGE):
-                # Remove translation from local storage
-                translator = self._storage.get(locale)
-                if translator:
-                    logger.debug("Removing translation: %s", key)
-            else:
-                value = self.deserializer(m.data)
-                changes[locale].append((key, value))
-            await m.ack()
-        self._set_new_compiled_messages(changes)
-
-    def _set_new_compiled_messages(self, new_messages: dict[str, list[str]]) -> None:
-        """Set new compiled messages for translators."""
-        for locale, messages in new_messages.items():
+            changes[locale][key] = None if kind in (KV_DEL, KV_PURGE) else self.deserializer(m.data)
+        await self._set_new_compiled_messages(changes)
+
+    async def _set_new_compiled_messages(self, new_messages: dict[str, dict[str, str | None]]) -> None:
+        """Compile new messages in a worker thread, then swap them into translators.
+        Deleted keys get messages of the base catalog back.
+        """
+        loop = asyncio.get_running_loop()
+        for locale, changes in new_messages.items():
             translator = self._storage.get(locale)
+            if translator is None and None not in self._subscriptions and locale not in self._subscriptions:
+                # Delivered by the consumer of all locales before subscriptions narrowed
+                continue
+            values = self._pending_translations if translator is None else self._values
+            locale_values = values.setdefault(locale, {})
+            locale_references = self._references.get(locale, {})
+            for key, value in changes.items():
+                locale_references.pop(key, None)
+                if value is None:
+                    locale_values.pop(key, None)
+                else:
+                    locale_values[key] = value
             if translator is None:
                 continue
 
-            for key, value in messages:
-                translator.update_translation(key, value)
+            messages, terms, affected = self._messages_to_compile(locale, changes)
+            deleted = {key for key, value in changes.items() if value is None and not key.startswith(TERM_SIGIL)}
+
+            started = time.perf_counter()
+            message_functions = await loop.run_in_executor(
+                self._executor,
+                _compile_translations,
+                translator,
+                messages,
+                terms,
+            )
+            if len(affected) < len(messages):
+                # Referenced messages are compiled along, but stay as they are
+                message_functions = {
+                    key: function
+                    for key, function in message_functions.items()
+                    if key.split(ATTRIBUTE_SEPARATOR, 1)[0] in affected
+                }
+            failed = sum(key not in message_functions for key in affected)
+            self.metrics.compiled(time.perf_counter() - started, errors=failed)
+            # Puts and deletes of a batch are published as a single version, so one rollback undoes all of them
+            changed = translator.apply(message_functions, deleted)
+            restored = changed - message_functions.keys()
+            if restored:
+                logger.debug("Restored translations of %s: %s", locale, ", ".join(sorted(restored)))
+
+    def _messages_to_compile(
+        self,
+        locale: str,
+        changes: dict[str, str | None],
+    ) -> tuple[dict[str, str], dict[str, str], set[str]]:
+        """Messages and terms to compile for changes of a locale, and keys of messages to apply.
+        A change of a term recompiles messages referencing it, along with messages they reference.
+        """
+        messages, terms = _split_terms(self._values[locale])
+        if not any(key.startswith(TERM_SIGIL) for key in changes):
+            changed = {key: value for key, value in changes.items() if value is not None}
+            return changed, terms, set(changed)
+
+        references = self._references.setdefault(locale, {})
+        for key, value in messages.items():
+            if key not in references:
+                references[key] = _value_references(key, value)
+        affected = with_dependents(changes, references).intersection(messages)
+        required = with_referenced(affected, references).intersection(messages)
+        return {key: messages[key] for key in required}, terms, affected
 
     async def close(self) -> None:
         """Close the storage."""
@@ -134,4 +386,39 @@ class NatsKvStorage(BaseStorage):
         await self._nc.close()
 
 
+def _split_terms(values: Mapping[str, str]) -> tuple[dict[str, str], dict[str, str]]:
+    """Split values of a locale into messages and terms."""
+    messages: dict[str, str] = {}
+    terms: dict[str, str] = {}
+    for key, value in values.items():
+        (terms if key.startswith(TERM_SIGIL) else messages)[key] = value
+    return messages, terms
+
+
+def _value_references(key: str, value: str) -> frozenset[str]:
+    """Ids of messages and terms referenced by a value, terms keyed like "-brand"."""
+    entry = FluentParser().parse_entry(f"{key} = {value}")
+    return entry_references(entry) if isinstance(entry, (Message, Term)) else frozenset()
+
+
+def _compile_translations(
+    translator: FluentTranslator,
+    messages: dict[str, str],
+    terms: dict[str, str],
+) -> dict[str, Callable[..., str]]:
+    """Compile messages with terms as a single batch. If some value is broken, compile them one by one to skip it."""
+    try:
+        return translator.compile_translations({**terms, **messages})
+    except KeyError:
+        pass
+
+    message_functions: dict[str, Callable[..., str]] = {}
+    for key, value in messages.items():
+        try:
+            message_functions.update(translator.compile_translations({**terms, key: value}))
+        except KeyError:  # noqa: PERF203
+            logger.warning("Can't compile translation %s for locale %s", key, translator.locale)
+    return message_functions
+
+
 NatsStorage = NatsKvStorage  # backward compatibility
@@ -1,35 +1,190 @@
 """A translator runner by itself"""
 
-from collections.abc import Iterable
-from typing import Any
+from __future__ import annotations
 
-from fluentogram.exceptions import KeyNotFoundError
-from fluentogram.translator import FluentTranslator
+import time
+from collections.abc import Iterable, Mapping
+from typing import Any, Callable, Union
+
+from fluentogram.cache import FormatCache, MissingKeys
+from fluentogram.exceptions import FormatError, KeyNotFoundError
+from fluentogram.functions import track_impure_calls
+from fluentogram.instrumentation import CallRecord, Instrumentation
+from fluentogram.storage.base import MergedMessages, MergedMessagesRef
+from fluentogram.translator import FluentTranslator, TranslationSnapshot
+
+Translator = Union[FluentTranslator, TranslationSnapshot]
+
+
+class AttributePath:
+    """Immutable message path, produced by attribute access to TranslatorRunner.
+    Every hop is created once per runner and cached, so "runner.items.count()" allocates nothing after the first call
+    and the same runner can be safely shared between concurrent handlers.
+    """
+
+    __slots__ = ("_children", "_key", "_runner")
+
+    def __init__(self, runner: TranslatorRunner, key: str) -> None:
+        self._runner = runner
+        self._key = key
+        self._children: dict[str, AttributePath] = {}
+
+    def __getattr__(self, item: str) -> AttributePath:
+        try:
+            return self._children[item]
+        except KeyError:
+            if item.startswith("__"):
+                raise AttributeError(item) from None
+        key = f"{self._key}{self._runner.separator}{item}"
+        return self._children.setdefault(item, AttributePath(self._runner, key))
+
+    def __call__(self, **kwargs: Any) -> str:
+        return self._runner._get_translation(self._key, **kwargs)  # noqa: SLF001
+
+    def __repr__(self) -> str:
+        return f"<fluentogram.AttributePath {self._key!r}>"
 
 
 class TranslatorRunner:
-    def __init__(self, translators: Iterable[FluentTranslator], separator: str = "-") -> None:
+    def __init__(  # noqa: PLR0913
+        self,
+        translators: Iterable[Translator],
+        separator: str = "-",
+        format_cache: FormatCache | None = None,
+        language: str = "",
+        merged_messages: MergedMessagesRef | None = None,
+        missing_keys: MissingKeys | None = None,
+        instrumentation: Instrumentation | None = None,
+    ) -> None:
         self.translators = translators
         self.separator = separator
-        self._request_line = ""
+        # State of the runner is private, so it never hides message keys from attribute access
+        # A single table of the whole fallback chain, so a lookup costs the same however long the chain is.
+        # It is read through the reference on every call, so updates of the storage apply at once
+        self._merged_messages = merged_messages
+        self._missing_keys = missing_keys
+        self._instrumentation = instrumentation
+        self._format_cache = format_cache
+        self._language = language
+        self._paths: dict[str, AttributePath] = {}
 
     def get(self, key: str, **kwargs: Any) -> str:
         """Fastest, direct way to use translator, without sugar-like typing supported attribute access way"""
         return self._get_translation(key, **kwargs)
 
+    def get_many(self, items: Iterable[tuple[str, Mapping[str, Any]]]) -> list[str]:
+        """Format a batch of (key, kwargs) pairs, resolving every distinct key only once"""
+        resolved: dict[str, Translator] = {}
+
+        def resolve(key: str) -> Translator:
+            translator = resolved.get(key)
+            if translator is None:
+                translator = resolved[key] = self._resolve(key)
+            return translator
+
+        return [self._measured_format(key, kwargs, resolve) for key, kwargs in items]
+
+    def _pin(self) -> TranslatorRunner:
+        """Get a runner over current snapshots of translators, unaffected by later updates, see TranslatorHub.pin()"""
+        translators = tuple(
+            translator.snapshot() if isinstance(translator, FluentTranslator) else translator
+            for translator in self.translators
+        )
+        # Keys are resolved by scanning the fallback chain, building an index per request would cost more
+        return TranslatorRunner(
+            translators,
+            self.separator,
+            language=self._language,
+            instrumentation=self._instrumentation,
+        )
+
     def _get_translation(self, key: str, **kwargs: Any) -> str:
-        for translator in self.translators:
-            text = translator.get(key, **kwargs)
-            if text is not None:
-                return text
+        return self._measured_format(key, kwargs, self._resolve)
 
-        raise KeyNotFoundError(key)
+    def _measured_format(self, key: str, kwargs: Mapping[str, Any], resolve: Callable[[str], Translator]) -> str:
+        """Format a message, measuring the call if instrumentation samples it"""
+        instrumentation = self._instrumentation
+        if instrumentation is None or not instrumentation.sample():
+            return self._format(key, kwargs, resolve)
 
-    def __getattr__(self, item: str) -> "TranslatorRunner":
-        self._request_line += f"{item}{self.separator}"
-        return self
+        error: Exception | None = None
+        started = time.perf_counter()
+        try:
+            return self._format(key, kwargs, resolve)
+        except (FormatError, KeyNotFoundError) as e:
+            error = e
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            instrumentation.record(CallRecord(self._language, key, seconds, self._fallback_depth(key), error))
 
-    def __call__(self, **kwargs: Any) -> str:
-        text = self._get_translation(self._request_line.rstrip(self.separator), **kwargs)
-        self._request_line = ""
+    def _fallback_depth(self, key: str) -> int | None:
+        """Position of the first translator of the fallback chain which owns a key"""
+        return next((depth for depth, translator in enumerate(self.translators) if translator.has_key(key)), None)
+
+    def _format(self, key: str, kwargs: Mapping[str, Any], resolve: Callable[[str], Translator]) -> str:
+        cache_key = None
+        if self._format_cache is not None:
+            cache_key = self._format_cache.make_key(self._language, key, kwargs)
+        if cache_key is None:
+            return self._format_uncached(key, kwargs, resolve)
+
+        text = self._format_cache.get(cache_key)
+        if text is None:
+            text, impure = track_impure_calls(lambda: self._format_uncached(key, kwargs, resolve))
+            # Output of impure Fluent functions may change from call to call
+            if not impure:
+                self._format_cache.put(cache_key, text)
+        return text
+
+    def _format_uncached(self, key: str, kwargs: Mapping[str, Any], resolve: Callable[[str], Translator]) -> str:
+        text = None if self._merged_messages is None else self._format_merged(self._merged_messages.merged, key, kwargs)
+        if text is None:
+            text = resolve(key).get(key, **kwargs)
+            if text is None:
+                raise KeyNotFoundError(key)
+        return text
+
+    @staticmethod
+    def _format_merged(merged: MergedMessages, key: str, kwargs: Mapping[str, Any]) -> str | None:
+        """Format a message taken from merged messages, or return None if it isn't there."""
+        text = merged.static_messages.get(key)
+        if text is not None:
+            return text
+        function = merged.functions.get(key)
+        if function is None:
+            return None
+        errors: list[Exception] = []
+        text = function(kwargs, errors)
+        if errors:
+            raise FormatError(errors.pop(), key)
         return text
+
+    def _resolve(self, key: str) -> Translator:
+        """Find the first translator of the fallback chain which owns a key"""
+        if self._merged_messages is not None:
+            translator = self._merged_messages.merged.owners.get(key)
+            if translator is not None:
+                return translator
+
+        # Translators notify the storage of every added key, which drops it from missing keys
+        if self._missing_keys is not None and key in self._missing_keys:
+            self._missing_keys.hit(key)
+            raise KeyNotFoundError(key)
+
+        # Runners without merged messages of a storage, like pinned ones, scan the fallback chain
+        for translator in self.translators:
+            if translator.has_key(key):
+                return translator
+
+        if self._missing_keys is not None:
+            self._missing_keys.hit(key)
+        raise KeyNotFoundError(key)
+
+    def __getattr__(self, item: str) -> AttributePath:
+        try:
+            return self._paths[item]
+        except KeyError:
+            if item.startswith("__"):
+                raise AttributeError(item) from None
+        return self._paths.setdefault(item, AttributePath(self, item))
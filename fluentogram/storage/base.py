@@ -4,27 +4,88 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from collections.abc import Iterable, Mapping
-from typing import TYPE_CHECKING
+from threading import Lock
+from typing import TYPE_CHECKING, Callable, NamedTuple
+
+from fluentogram.cache import MissingKeys
 
 if TYPE_CHECKING:
-    from fluentogram.translator import FluentTranslator
+    from fluentogram.functions import FluentFunctions
+    from fluentogram.translator import FluentTranslator, MessageFunction
+
+
+class MergedMessages(NamedTuple):
+    """Compiled messages of a language's fallback chain, where the earliest locale owning a key wins.
+    Message functions and texts are shared with translators, not copied. The table is never changed once built,
+    changes of translators build a new one.
+    """
+
+    functions: dict[str, MessageFunction]
+    # Texts of messages, which don't depend on arguments
+    static_messages: dict[str, str]
+    # Key -> the first translator of the fallback chain which owns it
+    owners: dict[str, FluentTranslator]
+
+
+class MergedMessagesRef:
+    """Current merged messages of a language. A new table is published with a single reference swap,
+    so a reader taking it once sees either all or none of the keys of an update.
+    """
+
+    __slots__ = ("merged",)
+
+    def __init__(self, merged: MergedMessages) -> None:
+        self.merged = merged
 
 
 class BaseStorage(ABC):
-    """Abstract storage for translators by locale."""
+    """Abstract storage for translators by locale.
+    Keys index and merged messages of every language are kept in sync with changes of translators in the storage,
+    whether they are made through the storage or directly.
+    """
 
     def __init__(self) -> None:
         """Initialize storage with empty containers."""
         self._storage: dict[str, FluentTranslator] = {}
         self._locales_map: dict[str, Iterable[str]] = {}
         self._translators_map: dict[str, Iterable[FluentTranslator]] = {}
+        self._merged_messages: dict[str, MergedMessagesRef] = {}
+        # Serializes rebuilds of merged messages, so concurrent updates don't lose each other's keys
+        self._merge_lock = Lock()
+        self._missing_keys: dict[str, MissingKeys] = {}
+        self._revision = 0
+        self._update_listeners: list[Callable[[str, str], None]] = []
+        # Custom Fluent functions, which catalogs and updates of the storage are compiled with
+        self.functions: FluentFunctions | None = None
+
+    @property
+    def revision(self) -> int:
+        """Counter of translators map rebuilds, used to invalidate objects built on top of it."""
+        return self._revision
 
     def get_locales_map(self) -> dict[str, Iterable[str]]:
         """Get the locales mapping configuration."""
         return self._locales_map
 
+    def use_functions(self, functions: FluentFunctions) -> None:
+        """Compile updates of all translators with custom Fluent functions, and catalogs not compiled yet.
+        Raises ValueError if the storage already uses other functions.
+        """
+        if self.functions is not None and self.functions is not functions:
+            raise ValueError("Storage already uses other Fluent functions")
+        self.functions = functions
+        for translator in self._storage.values():
+            if translator.functions is None:
+                translator.functions = functions
+
     def add_translator(self, translator: FluentTranslator) -> None:
         """Add a translator to storage."""
+        if self.functions is not None and translator.functions is None:
+            translator.functions = self.functions
+        previous = self._storage.get(translator.locale)
+        if previous is not None and previous is not translator:
+            previous.remove_change_listener(self._translator_changed)
+        translator.add_change_listener(self._translator_changed)
         self._storage[translator.locale] = translator
 
     def add_translators(self, translators: Iterable[FluentTranslator]) -> None:
@@ -46,7 +107,8 @@ class BaseStorage(ABC):
 
     def get_translators_by_locales(self, locales: Iterable[str]) -> Iterable[FluentTranslator]:
         """Get translators by list of locales."""
-        return tuple(self._storage[locale] for locale in locales if locale in self._storage)
+        translators = (self.get_translator(locale) for locale in locales)
+        return tuple(translator for translator in translators if translator is not None)
 
     def get_translators_list(self) -> list[FluentTranslator]:
         """Get all translators as a list."""
@@ -67,22 +129,164 @@ class BaseStorage(ABC):
         """Get translators for a specific language based on locales map."""
         return self._translators_map.get(language, ())
 
+    def get_keys_index(self, language: str) -> Mapping[str, FluentTranslator]:
+        """Get the current index of message keys to the first translator owning them for a specific language."""
+        merged = self.get_merged_messages(language)
+        return merged.owners if merged is not None else {}
+
+    def get_merged_messages(self, language: str) -> MergedMessages | None:
+        """Get current compiled messages of the whole fallback chain of a specific language, in a single table."""
+        ref = self.get_merged_messages_ref(language)
+        return ref.merged if ref is not None else None
+
+    def get_merged_messages_ref(self, language: str) -> MergedMessagesRef | None:
+        """Get the reference to merged messages of a specific language, which always points to the current table."""
+        return self._merged_messages.get(language)
+
+    def get_missing_keys(self, language: str) -> MissingKeys:
+        """Get the negative cache of keys missing in the whole fallback chain of a specific language."""
+        missing_keys = self._missing_keys.get(language)
+        if missing_keys is None:
+            missing_keys = self._missing_keys.setdefault(language, MissingKeys())
+        return missing_keys
+
     def _build_translators_map(self) -> None:
         """Build the translators map based on locales configuration."""
         self._translators_map = {
             lang: self.get_translators_by_locales(translator_locales)
             for lang, translator_locales in self._locales_map.items()
         }
+        self._merged_messages = {
+            lang: MergedMessagesRef(self._build_merged_messages(translators))
+            for lang, translators in self._translators_map.items()
+        }
+        for missing_keys in self._missing_keys.values():
+            missing_keys.clear()
+        self._revision += 1
+
+    @staticmethod
+    def _build_merged_messages(translators: Iterable[FluentTranslator]) -> MergedMessages:
+        """Merge messages of translators, the first translator of the fallback chain owning a key wins."""
+        merged = MergedMessages({}, {}, {})
+        for translator in reversed(tuple(translators)):
+            snapshot = translator.snapshot()
+            merged.functions.update(snapshot.messages)
+            for key in snapshot.messages.keys() - snapshot.static_messages.keys():
+                merged.static_messages.pop(key, None)
+            merged.static_messages.update(snapshot.static_messages)
+            merged.owners.update(dict.fromkeys(snapshot.messages, translator))
+        return merged
+
+    @staticmethod
+    def _remerge_keys(
+        merged: MergedMessages,
+        translators: Iterable[FluentTranslator],
+        keys: Iterable[str],
+    ) -> MergedMessages:
+        """Copy merged messages with keys taken from their current owners, or dropped if no translator has them."""
+        snapshots = [(translator, translator.snapshot()) for translator in translators]
+        remerged = MergedMessages(dict(merged.functions), dict(merged.static_messages), dict(merged.owners))
+        for key in keys:
+            owner, snapshot = next(((t, s) for t, s in snapshots if s.has_key(key)), (None, None))
+            if owner is None or snapshot is None:
+                remerged.functions.pop(key, None)
+                remerged.static_messages.pop(key, None)
+                remerged.owners.pop(key, None)
+                continue
+
+            remerged.functions[key] = snapshot.messages[key]
+            remerged.owners[key] = owner
+            text = snapshot.static_messages.get(key)
+            if text is None:
+                remerged.static_messages.pop(key, None)
+            else:
+                remerged.static_messages[key] = text
+        return remerged
+
+    def add_update_listener(self, listener: Callable[[str, str], None]) -> None:
+        """Register a callback, called with (locale, key) after every applied translation update."""
+        if listener not in self._update_listeners:
+            self._update_listeners.append(listener)
+
+    def remove_update_listener(self, listener: Callable[[str, str], None]) -> None:
+        """Unregister a callback registered by add_update_listener."""
+        if listener in self._update_listeners:
+            self._update_listeners.remove(listener)
+
+    def _translator_changed(self, translator: FluentTranslator, keys: set[str]) -> None:
+        # A replaced translator may still be changed by its owner, it doesn't affect the storage anymore
+        if self._storage.get(translator.locale) is translator:
+            self._translations_updated(translator, keys)
+
+    def _translations_updated(self, translator: FluentTranslator, keys: Iterable[str]) -> None:
+        """Keep derived structures in sync after keys were changed in a translator.
+        Merged messages of every language, which falls back to the translator, are rebuilt and published at once.
+        """
+        keys = tuple(keys)
+        with self._merge_lock:
+            for lang, translators in self._translators_map.items():
+                ref = self._merged_messages.get(lang)
+                if ref is not None and translator in translators:
+                    ref.merged = self._remerge_keys(ref.merged, translators, keys)
+                    self._forget_missing_keys(lang, ref.merged, keys)
+
+        for key in keys:
+            for listener in self._update_listeners:
+                listener(translator.locale, key)
+
+    def _forget_missing_keys(self, language: str, merged: MergedMessages, keys: Iterable[str]) -> None:
+        """Drop keys, which the fallback chain of a language owns now, from its missing keys."""
+        missing_keys = self._missing_keys.get(language)
+        if missing_keys is not None:
+            for key in keys:
+                if key in merged.owners:
+                    missing_keys.discard(key)
 
     async def update_translation(self, locale: str, key: str, value: str) -> bool:
         """Update a translation key for a specific locale."""
-        translator = self._storage.get(locale)
+        translator = self.get_translator(locale)
         if translator is None:
             return False
 
+        # The translator notifies the storage, see _translator_changed
         translator.update_translation(key, value)
         return True
 
+    async def update_translations(self, locale: str, translations: Mapping[str, str]) -> bool:
+        """Update several translation keys for a specific locale at once."""
+        translator = self.get_translator(locale)
+        if translator is None:
+            return False
+
+        translator.update_translations(translations)
+        return True
+
+    async def delete_translation(self, locale: str, key: str) -> bool:
+        """Drop an updated translation key, restoring its value from the base catalog."""
+        return await self.delete_translations(locale, (key,))
+
+    async def delete_translations(self, locale: str, keys: Iterable[str]) -> bool:
+        """Drop several updated translation keys at once, restoring their values from the base catalog.
+        Keys missing in the base catalog are removed, so fallback locales apply.
+        """
+        translator = self.get_translator(locale)
+        if translator is None:
+            return False
+
+        translator.restore_messages(keys)
+        return True
+
+    def rollback_translations(self, locale: str, version: int | None = None) -> bool:
+        """Roll a translator back to its previous snapshot of messages, or to a kept snapshot of given version.
+        Raises KeyError if the translator keeps no such snapshot.
+        """
+        translator = self.get_translator(locale)
+        if translator is None:
+            return False
+
+        translator.rollback(version)
+        return True
+
     @abstractmethod
     async def close(self) -> None:
         pass
@@ -0,0 +1,181 @@
+"""Compilation of FTL catalogs into portable artifacts.
+fluent_compiler produces message functions, which can't cross a process boundary. Instead, a catalog is compiled
+to a marshalled Python code object, which is executed in the target process to produce the message functions.
+"""
+
+from __future__ import annotations
+
+import builtins
+import hashlib
+import importlib.metadata
+import importlib.util
+import marshal
+import os
+import pickle
+import tempfile
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import Any, Callable, NamedTuple
+
+import babel
+from fluent_compiler import runtime
+from fluent_compiler.builtins import BUILTINS
+from fluent_compiler.bundle import FluentBundle
+from fluent_compiler.compiler import (
+    LOCALE_NAME,
+    PLURAL_FORM_FOR_NUMBER_NAME,
+    _parse_resources,
+    messages_to_module,
+)
+from fluent_compiler.resource import FtlResource
+from fluent_compiler.utils import TERM_SIGIL
+
+
+class CompiledLocale(NamedTuple):
+    locale: str
+    # Marshalled code object of the generated module
+    code: bytes
+    # Message id -> name of its function in the generated module
+    message_mapping: dict[str, str]
+    # Name in the generated module -> name of a Fluent function
+    function_names: dict[str, str]
+    errors: list[tuple[str | None, Exception]]
+
+
+def compile_locale(
+    locale: str,
+    text: str,
+    use_isolating: bool = False,  # noqa: FBT002
+    functions: Mapping[str, Callable[..., Any]] | None = None,
+) -> CompiledLocale:
+    """Compile FTL text of a locale. This function is picklable, so it may run in a worker process,
+    as long as custom functions are picklable too, e.g. importable module-level functions.
+    Functions are only inspected for their arguments, and looked up by name when the catalog is loaded.
+    """
+    functions = {**BUILTINS, **(functions or {})}
+    messages, parsing_errors = _parse_resources([FtlResource.from_string(text)])
+    module, message_mapping, module_globals, compilation_errors = messages_to_module(
+        messages,
+        _parse_locale(locale),
+        use_isolating=use_isolating,
+        functions=functions,
+    )
+    code = compile(module.as_ast(), f"<fluentogram {locale}>", "exec")
+    function_names = {
+        global_name: function_name
+        for global_name, value in module_globals.items()
+        for function_name, function in functions.items()
+        if value is function
+    }
+    return CompiledLocale(
+        locale=locale,
+        code=marshal.dumps(code),
+        message_mapping=dict(message_mapping),
+        function_names=function_names,
+        errors=parsing_errors + compilation_errors,
+    )
+
+
+def load_compiled_locale(
+    compiled: CompiledLocale,
+    functions: Mapping[str, Callable[..., Any]] | None = None,
+) -> FluentBundle:
+    """Execute a compiled catalog, and wrap its message functions into a FluentBundle.
+    Functions, which the catalog was compiled with, are looked up in functions by name.
+    """
+    functions = {**BUILTINS, **(functions or {})}
+    babel_locale = _parse_locale(compiled.locale)
+
+    module_globals: dict[str, Any] = {name: getattr(runtime, name) for name in runtime.__all__}
+    module_globals.update(builtins.__dict__)
+    module_globals[LOCALE_NAME] = babel_locale
+    module_globals[PLURAL_FORM_FOR_NUMBER_NAME] = _plural_form_function(babel_locale)
+    for global_name, function_name in compiled.function_names.items():
+        module_globals[global_name] = functions[function_name]
+
+    exec(marshal.loads(compiled.code), module_globals)  # noqa: S102, S302
+
+    return _make_bundle(
+        compiled.locale,
+        {
+            message_id: module_globals[function_name]
+            for message_id, function_name in compiled.message_mapping.items()
+            if not message_id.startswith(TERM_SIGIL)
+        },
+        compiled.errors,
+    )
+
+
+class CompiledCache:
+    """Directory of compiled catalogs, one file per locale.
+    Files are keyed by a hash of the FTL text, fluent_compiler version, Python bytecode version, use_isolating and
+    names of custom functions, so a changed catalog or environment never loads a stale artifact.
+    Outdated files of a locale are replaced.
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+
+    @staticmethod
+    def key(text: str, use_isolating: bool, function_names: Iterable[str] = ()) -> str:
+        digest = hashlib.sha256()
+        digest.update(importlib.metadata.version("fluent_compiler").encode())
+        digest.update(importlib.util.MAGIC_NUMBER)
+        digest.update(b"isolating" if use_isolating else b"plain")
+        # Calls of unknown functions are compiled to errors, so registering a function changes the artifact
+        digest.update(",".join(sorted(function_names)).encode())
+        digest.update(text.encode("utf8"))
+        return digest.hexdigest()
+
+    def get(self, locale: str, key: str) -> CompiledLocale | None:
+        try:
+            compiled = pickle.loads(self._path(locale, key).read_bytes())  # noqa: S301
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, TypeError, ValueError):
+            return None
+        return compiled if isinstance(compiled, CompiledLocale) else None
+
+    def put(self, key: str, compiled: CompiledLocale) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(compiled.locale, key)
+        # Write to a temporary file first, so concurrent processes never read a partially written artifact
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            pickle.dump(compiled, file)
+        Path(tmp_path).replace(path)
+
+        for outdated in self.directory.glob(f"{compiled.locale}.*.fluentogram"):
+            if outdated != path:
+                outdated.unlink(missing_ok=True)
+
+    def _path(self, locale: str, key: str) -> Path:
+        return self.directory / f"{locale}.{key}.fluentogram"
+
+
+def _make_bundle(
+    locale: str,
+    message_functions: Mapping[str, Callable[..., str]],
+    errors: list[tuple[str | None, Exception]],
+) -> FluentBundle:
+    # FluentBundle compiles resources in its constructor, so it is bypassed here
+    bundle = FluentBundle.__new__(FluentBundle)
+    bundle.locale = locale
+    bundle._compiled_messages = dict(message_functions)  # noqa: SLF001
+    bundle._compilation_errors = errors  # noqa: SLF001
+    return bundle
+
+
+def _parse_locale(locale: str) -> babel.Locale:
+    return babel.Locale.parse(locale.replace("-", "_"))
+
+
+def _plural_form_function(locale: babel.Locale) -> Callable[[Any], str | None]:
+    """The same plural form function, as fluent_compiler provides to generated modules."""
+    plural_form_for_number_main = babel.plural.to_python(locale.plural_form)
+
+    def plural_form_for_number(number: Any) -> str | None:
+        try:
+            return plural_form_for_number_main(number)
+        except TypeError:
+            return None
+
+    return plural_form_for_number
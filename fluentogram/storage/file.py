@@ -1,22 +1,73 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager, suppress
 from pathlib import Path
+from threading import RLock
+from typing import Any, Callable
 
 from fluent_compiler.bundle import FluentBundle
 
 from fluentogram.exceptions import LocalesNotFoundError
-from fluentogram.storage.base import BaseStorage
+from fluentogram.functions import FluentFunctions
+from fluentogram.storage.base import BaseStorage, MergedMessagesRef
+from fluentogram.storage.compiled import CompiledCache, CompiledLocale, compile_locale, load_compiled_locale
+from fluentogram.storage.watch import LocaleFiles
 from fluentogram.translator import FluentTranslator
 
+logger = logging.getLogger(__name__)
+
 
 class FileStorage(BaseStorage):
-    def __init__(self, path: str | Path, use_isolating: bool = False) -> None:  # noqa: FBT002
+    """Storage of translators compiled from a directory of FTL files, one subdirectory per locale.
+    With lazy=True, the constructor only scans locale directories, and each locale is compiled on first use.
+    Otherwise, all locales are compiled in the constructor: one after another, or in parallel, if more than one
+    worker process or an executor is given.
+    With cache_dir, compiled catalogs are stored on disk, and unchanged catalogs are loaded without compilation.
+    With watch=True, the storage tracks FTL files of loaded locales, and reload_changed() or start_watching()
+    recompile only messages of modified files into live translators.
+    With functions, catalogs are compiled with custom Fluent functions. In worker processes, the functions have to be
+    picklable, e.g. module-level functions. A hub passes its functions to a lazy storage, before locales are compiled.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        path: str | Path,
+        use_isolating: bool = False,  # noqa: FBT002
+        lazy: bool = False,  # noqa: FBT002
+        workers: int | None = None,
+        executor: Executor | None = None,
+        cache_dir: str | Path | None = None,
+        watch: bool = False,  # noqa: FBT002
+        functions: FluentFunctions | None = None,
+    ) -> None:
         super().__init__()
+        self.functions = functions
         self.path = Path(path)
         self.use_isolating = use_isolating
+        self.lazy = lazy
+        self.workers = workers
+        self._executor = executor
+        self._cache = CompiledCache(cache_dir) if cache_dir is not None else None
+        self.watch = watch
+        self._watched_locales: dict[str, tuple[FluentTranslator, LocaleFiles]] = {}
+        self._watch_task: asyncio.Task | None = None
+        self._pending_locales: dict[str, list[Path]] = {}
+        self._lock = RLock()
         self._load_translations()
 
-    def _extract_locales(self, path: Path) -> list[str]:
+    @classmethod
+    def read_locales(cls, path: str | Path) -> dict[str, str]:
+        """Read FTL text of every locale in a directory of FileStorage layout, without compiling it."""
+        path = Path(path)
+        locales_paths = cls._find_locales(path, cls._extract_locales(path))
+        return {locale: cls._read_locale(paths) for locale, paths in locales_paths.items()}
+
+    @staticmethod
+    def _extract_locales(path: Path) -> list[str]:
         if "{locale}" in path.parts:
             path = Path(*path.parts[: path.parts.index("{locale}")])
 
@@ -49,19 +100,229 @@ class FileStorage(BaseStorage):
 
     def _load_translations(self) -> None:
         locales = self._extract_locales(self.path)
-        for locale, paths in self._find_locales(self.path, locales).items():
-            texts = [path.read_text(encoding="utf8") for path in paths]
+        locales_paths = self._find_locales(self.path, locales)
+        if self.lazy:
+            self._pending_locales.update(locales_paths)
+            return
+
+        texts = {locale: self._read_locale(paths) for locale, paths in locales_paths.items()}
+        with self._compilation_executor() as executor:
+            for locale, bundle in self._build_bundles(texts, executor).items():
+                self._add_file_translator(FluentTranslator(locale=locale, translator=bundle, functions=self.functions))
+
+    def populate_cache(self) -> None:
+        """Compile every locale missing in the cache directory, without loading them to the storage.
+        Meant to be called at build time, so processes started later only load compiled catalogs.
+        """
+        if self._cache is None:
+            raise ValueError("FileStorage has no cache directory")
+
+        texts = self.read_locales(self.path)
+        with self._compilation_executor() as executor:
+            self._compile(texts, executor)
+
+    @contextmanager
+    def _compilation_executor(self) -> Iterator[Executor | None]:
+        if self._executor is not None:
+            yield self._executor
+        elif self.workers is not None and self.workers > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                yield executor
+        else:
+            yield None
+
+    @staticmethod
+    def _read_locale(paths: list[Path]) -> str:
+        return "\n".join(path.read_text(encoding="utf8") for path in paths)
 
-            self.add_translator(
-                FluentTranslator(
+    def _load_locale(self, locale: str, paths: list[Path]) -> FluentTranslator:
+        bundle = self._build_bundles({locale: self._read_locale(paths)}, executor=None)[locale]
+        return FluentTranslator(locale=locale, translator=bundle, functions=self.functions)
+
+    def _build_bundles(self, texts: dict[str, str], executor: Executor | None) -> dict[str, FluentBundle]:
+        if self._cache is None and executor is None:
+            return {
+                locale: FluentBundle.from_string(
+                    text=text,
                     locale=locale,
-                    translator=FluentBundle.from_string(
-                        text="\n".join(texts),
-                        locale=locale,
-                        use_isolating=self.use_isolating,
-                    ),
-                ),
+                    use_isolating=self.use_isolating,
+                    functions=self._bundle_functions(),
+                )
+                for locale, text in texts.items()
+            }
+
+        functions = self._bundle_functions()
+        return {
+            locale: load_compiled_locale(compiled, functions)
+            for locale, compiled in self._compile(texts, executor).items()
+        }
+
+    def _compile(self, texts: dict[str, str], executor: Executor | None) -> dict[str, CompiledLocale]:
+        """Compile locales to portable artifacts, taking them from the cache if possible.
+        Compilation of cache misses is fanned out to the executor, if any.
+        """
+        compiled: dict[str, CompiledLocale] = {}
+        cache_keys: dict[str, str] = {}
+        function_names = self.functions.names() if self.functions is not None else []
+        if self._cache is not None:
+            for locale, text in texts.items():
+                cache_keys[locale] = self._cache.key(text, self.use_isolating, function_names)
+                cached = self._cache.get(locale, cache_keys[locale])
+                if cached is not None:
+                    compiled[locale] = cached
+
+        missing = [locale for locale in texts if locale not in compiled]
+        # Functions as registered, not their memoizing wrappers, are sent to worker processes
+        functions = self.functions.compile_functions() if self.functions is not None else None
+        if executor is None:
+            compiled.update(
+                {locale: compile_locale(locale, texts[locale], self.use_isolating, functions) for locale in missing},
             )
+        else:
+            futures = {
+                locale: executor.submit(compile_locale, locale, texts[locale], self.use_isolating, functions)
+                for locale in missing
+            }
+            compiled.update({locale: future.result() for locale, future in futures.items()})
+
+        if self._cache is not None:
+            for locale in missing:
+                self._cache.put(cache_keys[locale], compiled[locale])
+        return compiled
+
+    def _bundle_functions(self) -> dict[str, Callable[..., Any]] | None:
+        return self.functions.bundle_functions() if self.functions is not None else None
+
+    def _load_pending_locale(self, locale: str) -> FluentTranslator | None:
+        with self._lock:
+            # Another thread may have compiled the locale while we were waiting for the lock
+            translator = self._storage.get(locale)
+            if translator is None and locale in self._pending_locales:
+                translator = self._load_locale(locale, self._pending_locales[locale])
+                self._add_file_translator(translator)
+            return translator
+
+    def _load_all_pending_locales(self) -> None:
+        for locale in tuple(self._pending_locales):
+            self._load_pending_locale(locale)
+
+    def _add_file_translator(self, translator: FluentTranslator) -> None:
+        self.add_translator(translator)
+        if self.watch:
+            locale = translator.locale
+            files = LocaleFiles(
+                locale,
+                find_paths=lambda: self._find_locales(self.path, [locale])[locale],
+                keys=translator.keys(),
+                use_isolating=self.use_isolating,
+                functions=self.functions,
+            )
+            self._watched_locales[locale] = (translator, files)
+
+    def reload_changed(self) -> dict[str, set[str]]:
+        """Recompile messages of FTL files modified since the last check, and swap them into live translators.
+        Returns updated and removed keys by locale.
+        """
+        updated: dict[str, set[str]] = {}
+        for locale, (translator, files) in tuple(self._watched_locales.items()):
+            # A translator explicitly added to the storage replaces files of its locale
+            if self._storage.get(locale) is not translator:
+                del self._watched_locales[locale]
+                continue
+
+            changed = files.changed_paths()
+            if not changed:
+                continue
+
+            with self._lock:
+                message_functions, removed = files.recompile(changed)
+                translator.replace_messages(message_functions, removed)
+            updated[locale] = message_functions.keys() | removed
+        return updated
+
+    def start_watching(self, interval: float = 1.0) -> asyncio.Task:
+        """Poll FTL files for modifications in a background task, until the storage is closed."""
+        if not self.watch:
+            raise ValueError("FileStorage is created without watch=True")
+        if self._watch_task is None:
+            self._watch_task = asyncio.create_task(self._watch_changes(interval))
+        return self._watch_task
+
+    async def _watch_changes(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.reload_changed()
+            except Exception:
+                logger.exception("Error while reloading FTL files")
+
+    def add_translator(self, translator: FluentTranslator) -> None:
+        """Add a translator to storage, it takes precedence over a not yet compiled locale directory."""
+        with self._lock:
+            self._pending_locales.pop(translator.locale, None)
+            super().add_translator(translator)
+
+    def get_translator(self, locale: str) -> FluentTranslator | None:
+        """Get translator by locale, compiling it on first use in lazy mode."""
+        translator = self._storage.get(locale)
+        if translator is None and locale in self._pending_locales:
+            translator = self._load_pending_locale(locale)
+        return translator
+
+    def has_translator(self, locale: str) -> bool:
+        return locale in self._pending_locales or super().has_translator(locale)
+
+    def get_all_translators(self) -> Iterable[FluentTranslator]:
+        self._load_all_pending_locales()
+        return super().get_all_translators()
+
+    def get_translators_list(self) -> list[FluentTranslator]:
+        self._load_all_pending_locales()
+        return super().get_translators_list()
+
+    def get_translators_map(self) -> dict[str, Iterable[FluentTranslator]]:
+        for language in self._locales_map:
+            self._ensure_language(language)
+        return super().get_translators_map()
+
+    def get_translators_for_language(self, language: str) -> Iterable[FluentTranslator]:
+        self._ensure_language(language)
+        return super().get_translators_for_language(language)
+
+    def get_merged_messages_ref(self, language: str) -> MergedMessagesRef | None:
+        self._ensure_language(language)
+        return super().get_merged_messages_ref(language)
+
+    def _build_translators_map(self) -> None:
+        if not self.lazy:
+            super()._build_translators_map()
+            return
+
+        # Languages are built on first use, see _ensure_language
+        with self._lock, self._merge_lock:
+            self._translators_map = {}
+            self._merged_messages = {}
+            for missing_keys in self._missing_keys.values():
+                missing_keys.clear()
+            self._revision += 1
+
+    def _ensure_language(self, language: str) -> None:
+        if language in self._translators_map or language not in self._locales_map:
+            return
+
+        with self._lock:
+            if language in self._translators_map:
+                return
+            translators = self.get_translators_by_locales(self._locales_map[language])
+            # Updates of translators remerge languages under the merge lock, so the language is either merged from
+            # updated translators, or added before the update is remerged, and never while it iterates languages
+            with self._merge_lock:
+                self._merged_messages[language] = MergedMessagesRef(self._build_merged_messages(translators))
+                self._translators_map[language] = translators
 
     async def close(self) -> None:
-        pass
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._watch_task
+            self._watch_task = None
@@ -0,0 +1,166 @@
+"""Incremental recompilation of watched FTL files, used by FileStorage hot reload"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import Callable, NamedTuple, Union
+
+from fluent.syntax import FluentParser, FluentSerializer
+from fluent.syntax.ast import Message, MessageReference, Term, TermReference
+from fluent.syntax.visitor import Visitor
+from fluent_compiler.compiler import compile_messages
+from fluent_compiler.resource import FtlResource
+from fluent_compiler.utils import ATTRIBUTE_SEPARATOR, TERM_SIGIL, ast_to_id
+
+from fluentogram.functions import FluentFunctions
+
+Entry = Union[Message, Term]
+MessageFunction = Callable[..., str]
+
+
+class _ReferencesCollector(Visitor):
+    def __init__(self) -> None:
+        self.references: set[str] = set()
+
+    def visit_MessageReference(self, node: MessageReference) -> None:  # noqa: N802
+        self.references.add(node.id.name)
+        self.generic_visit(node)
+
+    def visit_TermReference(self, node: TermReference) -> None:  # noqa: N802
+        self.references.add(f"{TERM_SIGIL}{node.id.name}")
+        self.generic_visit(node)
+
+
+def entry_references(entry: Entry) -> frozenset[str]:
+    """Ids of messages and terms referenced by an entry, terms keyed like "-brand"."""
+    collector = _ReferencesCollector()
+    collector.visit(entry)
+    return frozenset(collector.references)
+
+
+def with_dependents(ids: Iterable[str], references: Mapping[str, frozenset[str]]) -> set[str]:
+    """Messages reference each other's compiled functions, so referencing messages are recompiled too"""
+    affected = set(ids)
+    while True:
+        dependents = {
+            entry_id
+            for entry_id, entry_references in references.items()
+            if entry_id not in affected and not entry_references.isdisjoint(affected)
+        }
+        if not dependents:
+            return affected
+        affected |= dependents
+
+
+def with_referenced(ids: Iterable[str], references: Mapping[str, frozenset[str]]) -> set[str]:
+    """Referenced messages and terms are compiled along, so references resolve"""
+    required = set(ids)
+    pending = list(required)
+    while pending:
+        for reference in references.get(pending.pop(), ()):
+            if reference in references and reference not in required:
+                required.add(reference)
+                pending.append(reference)
+    return required
+
+
+class _ParsedEntry(NamedTuple):
+    entry: Entry
+    references: frozenset[str]
+
+
+class _ParsedFile(NamedTuple):
+    mtime: float
+    entries: dict[str, _ParsedEntry]
+
+
+def _parse_file(path: Path) -> _ParsedFile:
+    mtime = path.stat().st_mtime
+    entries: dict[str, _ParsedEntry] = {}
+    for item in FluentParser().parse(path.read_text(encoding="utf8")).body:
+        if isinstance(item, (Message, Term)):
+            entries.setdefault(ast_to_id(item), _ParsedEntry(item, entry_references(item)))
+    return _ParsedFile(mtime, entries)
+
+
+def _message_id(key: str) -> str:
+    return key.split(ATTRIBUTE_SEPARATOR, 1)[0]
+
+
+class LocaleFiles:
+    """FTL files of a single locale, watched for modifications by their mtime.
+    Tracks which messages came from which file, so a change only recompiles messages of modified files,
+    together with messages referencing them.
+    """
+
+    def __init__(
+        self,
+        locale: str,
+        find_paths: Callable[[], Iterable[Path]],
+        keys: Iterable[str],
+        use_isolating: bool,
+        functions: FluentFunctions | None = None,
+    ) -> None:
+        self.locale = locale
+        self.use_isolating = use_isolating
+        self.functions = functions
+        self.keys = set(keys)
+        self._find_paths = find_paths
+        self._files = {path: _parse_file(path) for path in find_paths()}
+
+    def changed_paths(self) -> set[Path]:
+        """Find files modified, created or removed since the last recompilation."""
+        paths = set(self._find_paths())
+        changed = {path for path in paths if path not in self._files or self._files[path].mtime != path.stat().st_mtime}
+        changed.update(path for path in self._files if path not in paths)
+        return changed
+
+    def recompile(self, changed: set[Path]) -> tuple[dict[str, MessageFunction], set[str]]:
+        """Recompile messages affected by changed files.
+        Returns compiled functions of updated messages, and keys of removed ones.
+        """
+        affected: set[str] = set()
+        for path in changed:
+            if path in self._files:
+                affected.update(self._files[path].entries)
+            if path.exists():
+                self._files[path] = _parse_file(path)
+                affected.update(self._files[path].entries)
+            else:
+                del self._files[path]
+
+        entries: dict[str, _ParsedEntry] = {}
+        for parsed in self._files.values():
+            for entry_id, entry in parsed.entries.items():
+                entries.setdefault(entry_id, entry)
+
+        references = {entry_id: entry.references for entry_id, entry in entries.items()}
+        affected = with_dependents(affected, references)
+        to_compile = {entry_id for entry_id in affected if entry_id in entries and not entry_id.startswith(TERM_SIGIL)}
+        functions = self._compile(to_compile, entries, references)
+        removed = {key for key in self.keys if _message_id(key) in affected and key not in functions}
+        self.keys = (self.keys - removed) | functions.keys()
+        return functions, removed
+
+    def _compile(
+        self,
+        ids: set[str],
+        entries: dict[str, _ParsedEntry],
+        references: Mapping[str, frozenset[str]],
+    ) -> dict[str, MessageFunction]:
+        if not ids:
+            return {}
+
+        required = with_referenced(ids, references)
+        serializer = FluentSerializer()
+        text = "".join(
+            serializer.serialize_entry(entry.entry) for entry_id, entry in entries.items() if entry_id in required
+        )
+        compiled = compile_messages(
+            self.locale,
+            [FtlResource.from_string(text)],
+            use_isolating=self.use_isolating,
+            functions=None if self.functions is None else self.functions.bundle_functions(),
+        )
+        return {key: function for key, function in compiled.message_functions.items() if _message_id(key) in ids}
@@ -2,16 +2,20 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterable
 from datetime import datetime
 
-from fluent_compiler.types import FluentDateType, FluentNone, fluent_date
+from babel import Locale
+from fluent_compiler.types import FluentDateType, FluentNone
 
 from fluentogram.transformers.base import AbstractDataTransformer
+from fluentogram.transformers.memo import date_format, memoized_date, parse_locale
 
 
 class DateTimeTransformer(AbstractDataTransformer):
     """This transformer converts a default python datetime object to FluentDate
     Typings refer to https://github.com/tc39/ecma402
+    Options are validated once per option set and shared between dates, as well as formatted texts.
     """
 
     def __new__(
@@ -19,7 +23,17 @@ class DateTimeTransformer(AbstractDataTransformer):
         date: datetime,
         **kwargs,
     ) -> FluentDateType | FluentNone:
-        return fluent_date(
-            date,
-            **kwargs,
-        )
+        return memoized_date(date, kwargs, date_format(kwargs))
+
+    @classmethod
+    def many(cls, dates: Iterable[datetime], **kwargs) -> list[FluentDateType | FluentNone]:
+        """Transform a list of dates with the same options, resolving them once."""
+        memo = date_format(kwargs)
+        return [memoized_date(date, kwargs, memo) for date in dates]
+
+    @classmethod
+    def format_many(cls, dates: Iterable[datetime], locale: str | Locale, **kwargs) -> list[str]:
+        """Format a list of dates to texts for a locale, the way a message would render them."""
+        if isinstance(locale, str):
+            locale = parse_locale(locale)
+        return [date.format(locale) for date in cls.many(dates, **kwargs)]
@@ -0,0 +1,190 @@
+"""Memoized options of fluent_number and fluent_date, shared by all values transformed with the same option set.
+Formatting with Babel resolves locale data and number patterns on every call, so each option set also caches
+adjusted number patterns per locale pattern, and formatted texts per (locale, value).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Hashable
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable, Union
+
+from babel import Locale
+from babel.numbers import NumberPattern
+from fluent_compiler.types import (
+    FluentDate,
+    FluentDateTime,
+    FluentDateType,
+    FluentDecimal,
+    FluentFloat,
+    FluentInt,
+    FluentNone,
+    FluentNumber,
+    fluent_date,
+    fluent_number,
+)
+
+# Formatted texts kept per option set
+TEXTS_CACHE_SIZE = 1024
+# Option sets kept at once, each one with its own texts cache
+FORMATS_CACHE_SIZE = 256
+
+Number = Union[int, float, Decimal]
+OptionsKey = tuple[tuple[str, Hashable], ...]
+
+_SAMPLE_DATETIME = datetime(2000, 1, 1)  # noqa: DTZ001
+
+
+class MemoizedFormat:
+    """Options of one option set, with formatted texts cached per (locale, value)."""
+
+    def __init__(self, options: Any, format_uncached: Callable[[Any, Locale], str]) -> None:
+        self.options = options
+        self._format_uncached = format_uncached
+        self._patterns: dict[NumberPattern, NumberPattern] = {}
+        self.format = lru_cache(maxsize=TEXTS_CACHE_SIZE)(self._format)
+
+    def _format(self, locale: Locale, _: Hashable, value: Any) -> str:
+        # Equal values may still be formatted differently, so the caller distinguishes them by the second argument
+        return self._format_uncached(value, locale)
+
+    def apply_options(self, number: FluentNumber, pattern: NumberPattern) -> NumberPattern:
+        """Adjust a pattern of the locale to the options, once per pattern. Babel doesn't mutate patterns."""
+        adjusted = self._patterns.get(pattern)
+        if adjusted is None:
+            adjusted = self._patterns.setdefault(pattern, FluentNumber._apply_options(number, pattern))  # noqa: SLF001
+        return adjusted
+
+
+class _MemoizedNumber(FluentNumber):
+    _memo: MemoizedFormat
+
+    def format(self, locale: Locale) -> str:
+        # Decimal("1") and Decimal("1.00") are equal, but may take different plural forms of a currency name
+        return self._memo.format(locale, (type(self), str(self)), self)
+
+    def _apply_options(self, pattern: NumberPattern) -> NumberPattern:
+        return self._memo.apply_options(self, pattern)
+
+
+class _MemoizedInt(_MemoizedNumber, FluentInt):
+    pass
+
+
+class _MemoizedFloat(_MemoizedNumber, FluentFloat):
+    pass
+
+
+class _MemoizedDecimal(_MemoizedNumber, FluentDecimal):
+    pass
+
+
+class _MemoizedDateType(FluentDateType):
+    _memo: MemoizedFormat
+
+    def format(self, locale: Locale) -> str:
+        return self._memo.format(locale, (type(self), getattr(self, "tzinfo", None)), self)
+
+
+class _MemoizedDate(_MemoizedDateType, FluentDate):
+    pass
+
+
+class _MemoizedDateTime(_MemoizedDateType, FluentDateTime):
+    pass
+
+
+def _options_key(options: dict[str, Any]) -> OptionsKey | None:
+    # Not sorted: transformers pass options in a fixed order, and other orders only cost a cache entry
+    key = tuple(options.items())
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+@lru_cache(maxsize=FORMATS_CACHE_SIZE)
+def _number_format(key: OptionsKey) -> MemoizedFormat:
+    # Options are validated once, by fluent_number itself
+    return MemoizedFormat(fluent_number(0, **dict(key)).options, FluentNumber.format)
+
+
+@lru_cache(maxsize=FORMATS_CACHE_SIZE)
+def _date_format(key: OptionsKey) -> MemoizedFormat:
+    return MemoizedFormat(fluent_date(_SAMPLE_DATETIME, **dict(key)).options, FluentDateType.format)
+
+
+def number_format(options: dict[str, Any]) -> MemoizedFormat | None:
+    """Shared format of fluent_number options, or None if they can't be hashed."""
+    key = _options_key(options)
+    return None if key is None else _number_format(key)
+
+
+def date_format(options: dict[str, Any]) -> MemoizedFormat | None:
+    """Shared format of fluent_date options, or None if they can't be hashed."""
+    key = _options_key(options)
+    return None if key is None else _date_format(key)
+
+
+@lru_cache(maxsize=FORMATS_CACHE_SIZE)
+def parse_locale(locale: str) -> Locale:
+    """Babel locale of a Fluent locale, parsed the way fluent_compiler does it."""
+    return Locale.parse(locale.replace("-", "_"))
+
+
+def memoized_number(
+    number: Number | FluentNone,
+    options: dict[str, Any],
+    memo: MemoizedFormat | None,
+) -> FluentNumber | FluentNone:
+    """Same as fluent_number(number, **options), with options and formatted texts shared through memo.
+    Numbers, which already carry options, are merged with the option set by fluent_number.
+    """
+    if memo is None or isinstance(number, (FluentNumber, FluentNone)):
+        return fluent_number(number, **options)
+
+    # Options are set below, so the constructor of FluentNumber, merging them, is skipped
+    if isinstance(number, int):
+        memoized: _MemoizedNumber = int.__new__(_MemoizedInt, number)
+    elif isinstance(number, float):
+        memoized = float.__new__(_MemoizedFloat, number)
+    elif isinstance(number, Decimal):
+        memoized = Decimal.__new__(_MemoizedDecimal, number)
+    else:
+        return fluent_number(number, **options)
+    memoized._memo = memo  # noqa: SLF001
+    memoized.options = memo.options
+    return memoized
+
+
+def memoized_date(
+    value: date | FluentNone,
+    options: dict[str, Any],
+    memo: MemoizedFormat | None,
+) -> FluentDateType | FluentNone:
+    """Same as fluent_date(value, **options), with options and formatted texts shared through memo."""
+    if memo is None or isinstance(value, (FluentDateType, FluentNone)):
+        return fluent_date(value, **options)
+
+    if isinstance(value, datetime):
+        memoized: _MemoizedDateType = _MemoizedDateTime(
+            value.year,
+            value.month,
+            value.day,
+            value.hour,
+            value.minute,
+            value.second,
+            value.microsecond,
+            tzinfo=value.tzinfo,
+        )
+    elif isinstance(value, date) and "timeStyle" not in options:
+        memoized = _MemoizedDate(value.year, value.month, value.day)
+    else:
+        # Raises the same errors as fluent_date
+        return fluent_date(value, **options)
+    memoized._memo = memo  # noqa: SLF001
+    memoized.options = memo.options
+    return memoized
@@ -2,17 +2,22 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterable
 from decimal import Decimal
-from typing import Literal
+from typing import Any, Literal
 
-from fluent_compiler.types import FluentNone, FluentNumber, fluent_number
+from babel import Locale
+from fluent_compiler.types import FluentNone, FluentNumber
 
 from fluentogram.transformers.base import AbstractDataTransformer
+from fluentogram.transformers.memo import memoized_number, number_format, parse_locale
 
 
 class MoneyTransformer(AbstractDataTransformer):
     """This transformer converts a decimal object to FluentNumber with proper metadata.
     Typings refer to https://github.com/tc39/ecma402
+    Options are validated once per option set and shared between amounts, as well as formatted texts,
+    so formatting the same prices again costs a cache lookup.
     """
 
     def __new__(  # noqa: PLR0913
@@ -27,15 +32,94 @@ class MoneyTransformer(AbstractDataTransformer):
         maximum_fraction_digits: int | None = None,
         **kwargs,
     ) -> FluentNumber | FluentNone:
-        return fluent_number(
-            amount,
-            style="currency",
-            currencyDisplay=currency_display,
-            currency=currency,
-            useGrouping=use_grouping,
-            minimumSignificantDigits=minimum_significant_digits,
-            maximumSignificantDigits=maximum_significant_digits,
-            minimumFractionDigits=minimum_fraction_digits,
-            maximumFractionDigits=maximum_fraction_digits,
+        options = cls._options(
+            currency,
+            currency_display,
+            use_grouping,
+            minimum_significant_digits,
+            maximum_significant_digits,
+            minimum_fraction_digits,
+            maximum_fraction_digits,
+            kwargs,
+        )
+        return memoized_number(amount, options, number_format(options))
+
+    @classmethod
+    def many(  # noqa: PLR0913
+        cls,
+        amounts: Iterable[Decimal],
+        currency: str,
+        currency_display: Literal["code", "symbol", "name"] = "code",
+        use_grouping: bool = False,  # noqa: FBT002
+        minimum_significant_digits: int | None = None,
+        maximum_significant_digits: int | None = None,
+        minimum_fraction_digits: int | None = None,
+        maximum_fraction_digits: int | None = None,
+        **kwargs: Any,
+    ) -> list[FluentNumber | FluentNone]:
+        """Transform a list of amounts with the same options, resolving them once."""
+        options = cls._options(
+            currency,
+            currency_display,
+            use_grouping,
+            minimum_significant_digits,
+            maximum_significant_digits,
+            minimum_fraction_digits,
+            maximum_fraction_digits,
+            kwargs,
+        )
+        memo = number_format(options)
+        return [memoized_number(amount, options, memo) for amount in amounts]
+
+    @classmethod
+    def format_many(  # noqa: PLR0913
+        cls,
+        amounts: Iterable[Decimal],
+        locale: str | Locale,
+        currency: str,
+        currency_display: Literal["code", "symbol", "name"] = "code",
+        use_grouping: bool = False,  # noqa: FBT002
+        minimum_significant_digits: int | None = None,
+        maximum_significant_digits: int | None = None,
+        minimum_fraction_digits: int | None = None,
+        maximum_fraction_digits: int | None = None,
+        **kwargs: Any,
+    ) -> list[str]:
+        """Format a list of amounts to texts for a locale, the way a message would render them, e.g. for price lists."""
+        if isinstance(locale, str):
+            locale = parse_locale(locale)
+        numbers = cls.many(
+            amounts,
+            currency,
+            currency_display,
+            use_grouping,
+            minimum_significant_digits,
+            maximum_significant_digits,
+            minimum_fraction_digits,
+            maximum_fraction_digits,
             **kwargs,
         )
+        return [number.format(locale) for number in numbers]
+
+    @staticmethod
+    def _options(  # noqa: PLR0913
+        currency: str,
+        currency_display: str,
+        use_grouping: bool,
+        minimum_significant_digits: int | None,
+        maximum_significant_digits: int | None,
+        minimum_fraction_digits: int | None,
+        maximum_fraction_digits: int | None,
+        kwargs: dict[str, Any],
+    ) -> dict[str, Any]:
+        return {
+            "style": "currency",
+            "currencyDisplay": currency_display,
+            "currency": currency,
+            "useGrouping": use_grouping,
+            "minimumSignificantDigits": minimum_significant_digits,
+            "maximumSignificantDigits": maximum_significant_digits,
+            "minimumFractionDigits": minimum_fraction_digits,
+            "maximumFractionDigits": maximum_fraction_digits,
+            **kwargs,
+        }
@@ -2,42 +2,332 @@
 
 from __future__ import annotations
 
-from typing import Any
+import time
+from collections import deque
+from collections.abc import Iterable, Mapping
+from threading import Lock
+from typing import Any, Callable
 
 from fluent_compiler.bundle import FluentBundle
 from fluent_compiler.compiler import compile_messages
 from fluent_compiler.resource import FtlResource
+from fluent_compiler.utils import ATTRIBUTE_SEPARATOR, TERM_SIGIL
 
-from fluentogram.exceptions import FormatError
+from fluentogram.exceptions import FormatError, KeyNotFoundError
+from fluentogram.functions import FluentFunctions, track_impure_calls
+from fluentogram.instrumentation import CallRecord, Instrumentation
+
+MessageFunction = Callable[..., str]
+ChangeListener = Callable[["FluentTranslator", set[str]], None]
+
+
+class TranslationSnapshot:
+    """Immutable version of compiled messages of a translator.
+    A snapshot is never changed after it is published, so it is read without locks, and may be pinned
+    to translate a whole request with the same version of messages.
+    """
+
+    __slots__ = ("base_messages", "locale", "messages", "static_messages", "version")
+
+    def __init__(
+        self,
+        locale: str,
+        version: int,
+        messages: dict[str, MessageFunction],
+        static_messages: dict[str, str],
+        base_messages: dict[str, MessageFunction | None],
+    ) -> None:
+        self.locale = locale
+        self.version = version
+        self.messages = messages
+        # Texts of messages, which don't depend on arguments
+        self.static_messages = static_messages
+        # Overridden key -> its function in the base catalog, None if the base catalog has no such key
+        self.base_messages = base_messages
+
+    def get(self, key: str, **kwargs: Any) -> str | None:
+        return self.format(key, kwargs)
+
+    def format(self, key: str, kwargs: Mapping[str, Any]) -> str | None:
+        text = self.static_messages.get(key)
+        if text is not None:
+            return text
+
+        function = self.messages.get(key)
+        if function is None:
+            return None
+        errors: list[Exception] = []
+        text = function(kwargs, errors)
+        if errors:
+            raise FormatError(errors.pop(), key)
+        return text
+
+    def has_key(self, key: str) -> bool:
+        return key in self.messages
+
+    def keys(self) -> Iterable[str]:
+        return self.messages.keys()
+
+    def __repr__(self) -> str:
+        return f"<fluentogram.TranslationSnapshot {self.locale!r} v{self.version}>"
 
 
 class FluentTranslator:
-    """Single-locale Translator, implemented with fluent_compiler Bundles"""
+    """Single-locale Translator, implemented with fluent_compiler Bundles.
+    Compiled messages are kept in immutable snapshots: every update publishes a new one by a single reference swap,
+    so readers never see a half-applied batch, and the last history_size versions may be rolled back to.
+    Change listeners learn about every published change, whether it is made through a storage or directly.
+    """
 
-    def __init__(self, locale: str, translator: FluentBundle, separator: str = "-") -> None:
+    def __init__(
+        self,
+        locale: str,
+        translator: FluentBundle,
+        separator: str = "-",
+        history_size: int = 10,
+        functions: FluentFunctions | None = None,
+    ) -> None:
         self.locale = locale
         self.translator = translator
         self.separator = separator
+        # Custom Fluent functions, which updates are compiled with. The bundle has to be compiled with them too
+        self.functions = functions
+        messages = dict(self.translator._compiled_messages)  # noqa: SLF001
+        static_messages: dict[str, str] = {}
+        for key, function in messages.items():
+            text = self._render_static(function)
+            if text is not None:
+                static_messages[key] = text
+        self._snapshot = TranslationSnapshot(locale, 1, messages, static_messages, {})
+        self._last_version = 1
+        self._history: deque[TranslationSnapshot] = deque(maxlen=history_size)
+        self._write_lock = Lock()
+        self._change_listeners: list[ChangeListener] = []
+        # Opt-in measurement of direct get() calls. Runners of a hub are instrumented on their own
+        self.instrumentation: Instrumentation | None = None
 
     def get(self, key: str, **kwargs: Any) -> str | None:
         """STR100: Calling format with insecure string.
         Route questions to --> https://github.com/django-ftl/fluent-compiler
         """
-        try:
-            text, errors = self.translator.format(key, kwargs)
-            if errors:
-                raise FormatError(errors.pop(), key)
-        except KeyError:
-            return None
+        instrumentation = self.instrumentation
+        if instrumentation is None or not instrumentation.sample():
+            return self._snapshot.format(key, kwargs)
 
+        started = time.perf_counter()
+        try:
+            text = self._snapshot.format(key, kwargs)
+        except FormatError as e:
+            instrumentation.record(CallRecord(self.locale, key, time.perf_counter() - started, 0, e))
+            raise
+        seconds = time.perf_counter() - started
+        if text is None:
+            instrumentation.record(CallRecord(self.locale, key, seconds, None, KeyNotFoundError(key)))
+        else:
+            instrumentation.record(CallRecord(self.locale, key, seconds, 0, None))
         return text
 
+    def has_key(self, key: str) -> bool:
+        """Check if a message with given key is compiled in this translator."""
+        return key in self._snapshot.messages
+
+    def keys(self) -> Iterable[str]:
+        """Get all message keys compiled in this translator."""
+        return self._snapshot.messages.keys()
+
+    @property
+    def version(self) -> int:
+        """Version of the current snapshot, incremented by every update."""
+        return self._snapshot.version
+
+    def snapshot(self, version: int | None = None) -> TranslationSnapshot:
+        """Get the current snapshot of compiled messages, or one of kept previous versions.
+        Keep it for the length of a request to translate the whole request with the same messages.
+        """
+        snapshot = self._snapshot
+        if version is None or version == snapshot.version:
+            return snapshot
+        for previous in self._history:
+            if previous.version == version:
+                return previous
+        raise KeyError(version)
+
+    def add_change_listener(self, listener: ChangeListener) -> None:
+        """Register a callback, called with (translator, keys) after every published change of messages."""
+        if listener not in self._change_listeners:
+            self._change_listeners.append(listener)
+
+    def remove_change_listener(self, listener: ChangeListener) -> None:
+        """Unregister a callback registered by add_change_listener."""
+        if listener in self._change_listeners:
+            self._change_listeners.remove(listener)
+
+    def rollback(self, version: int | None = None) -> set[str]:
+        """Make the previous snapshot, or a kept snapshot of given version, current again.
+        Snapshots published after it are dropped. Returns keys, which messages have changed.
+        Raises KeyError if there is no such snapshot.
+        """
+        with self._write_lock:
+            if not self._history or (version is not None and all(s.version != version for s in self._history)):
+                raise KeyError(version)
+            current = self._snapshot
+            target = self._history.pop()
+            while version is not None and target.version != version:
+                target = self._history.pop()
+            self._publish(target)
+        changed = {
+            key
+            for key in current.messages.keys() | target.messages.keys()
+            if current.messages.get(key) is not target.messages.get(key)
+        }
+        self._notify(changed)
+        return changed
+
     def update_translation(self, key: str, value: str) -> None:
         """Update a translation key for a specific locale."""
-        self.translator._compiled_messages[key] = compile_messages(  # noqa: SLF001
+        self.update_translations({key: value})
+
+    def update_translations(self, translations: Mapping[str, str]) -> None:
+        """Update several translation keys at once, compiling all of them as a single resource."""
+        self.override_messages(self.compile_translations(translations))
+
+    def compile_translations(self, translations: Mapping[str, str]) -> dict[str, MessageFunction]:
+        """Compile translations as a single resource, without applying them.
+        Terms among translations, keyed like "-brand", are compiled with the resource for its messages to reference,
+        only message functions are returned. The translator isn't touched, so this may run in a worker thread.
+        Raises KeyError if any of messages can't be compiled.
+        """
+        if not translations:
+            return {}
+
+        compiled = compile_messages(
             self.locale,
-            [FtlResource.from_string(f"{key} = {value}")],
-        ).message_functions[key]
+            [FtlResource.from_string("\n".join(f"{key} = {value}" for key, value in translations.items()))],
+            functions=None if self.functions is None else self.functions.bundle_functions(),
+        )
+        message_functions = {
+            key: function
+            for key, function in compiled.message_functions.items()
+            if key.split(ATTRIBUTE_SEPARATOR, 1)[0] in translations
+        }
+        for key in translations:
+            if key not in message_functions and not key.startswith(TERM_SIGIL):
+                raise KeyError(key)
+        return message_functions
+
+    def is_overridden(self, key: str) -> bool:
+        """Check if a key is overridden by an update, rather than taken from the base catalog."""
+        return key in self._snapshot.base_messages
+
+    def override_messages(self, message_functions: Mapping[str, MessageFunction]) -> None:
+        """Put compiled message functions over the base catalog, keeping base ones to restore them later."""
+        self.apply(message_functions)
+
+    def restore_messages(self, keys: Iterable[str]) -> set[str]:
+        """Drop overrides of keys, bringing back messages of the base catalog.
+        Keys missing in the base catalog are removed, so fallback locales apply. Returns keys actually restored.
+        """
+        return self.apply({}, keys)
+
+    def apply(self, message_functions: Mapping[str, MessageFunction], restored_keys: Iterable[str] = ()) -> set[str]:
+        """Override messages and restore other keys from the base catalog, see override_messages() and
+        restore_messages(), as a single version. Nothing is published if nothing changes.
+        Returns keys, which messages have changed.
+        """
+        with self._write_lock:
+            current = self._snapshot
+            base_messages = dict(current.base_messages)
+            restored: dict[str, MessageFunction] = {}
+            removed: set[str] = set()
+            for key in restored_keys:
+                if key in message_functions or key not in base_messages:
+                    continue
+                function = base_messages.pop(key)
+                if function is None:
+                    removed.add(key)
+                else:
+                    restored[key] = function
+            for key in message_functions:
+                if key not in base_messages:
+                    base_messages[key] = current.messages.get(key)
+            if not message_functions and not restored and not removed:
+                return set()
+            self._publish_changes({**restored, **message_functions}, removed, base_messages)
+        changed = message_functions.keys() | restored.keys() | removed
+        self._notify(changed)
+        return changed
+
+    def replace_messages(
+        self,
+        message_functions: Mapping[str, MessageFunction],
+        removed: Iterable[str] = (),
+    ) -> None:
+        """Replace messages of the base catalog, and drop removed keys. Overrides stay on top of it."""
+        with self._write_lock:
+            base_messages = dict(self._snapshot.base_messages)
+            live_functions = {}
+            for key, function in message_functions.items():
+                if key in base_messages:
+                    base_messages[key] = function
+                else:
+                    live_functions[key] = function
+            live_removed = set()
+            for key in removed:
+                if key in base_messages:
+                    base_messages[key] = None
+                else:
+                    live_removed.add(key)
+            self._publish_changes(live_functions, live_removed, base_messages)
+        self._notify(live_functions.keys() | live_removed)
+
+    def _publish_changes(
+        self,
+        message_functions: Mapping[str, MessageFunction],
+        removed: Iterable[str],
+        base_messages: dict[str, MessageFunction | None],
+    ) -> None:
+        """Build a new snapshot from the current one with changes applied, and publish it."""
+        current = self._snapshot
+        messages = dict(current.messages)
+        static_messages = dict(current.static_messages)
+        messages.update(message_functions)
+        for key, function in message_functions.items():
+            text = self._render_static(function)
+            if text is None:
+                static_messages.pop(key, None)
+            else:
+                static_messages[key] = text
+        for key in removed:
+            messages.pop(key, None)
+            static_messages.pop(key, None)
+
+        self._last_version += 1
+        self._history.append(current)
+        self._publish(TranslationSnapshot(self.locale, self._last_version, messages, static_messages, base_messages))
+
+    def _publish(self, snapshot: TranslationSnapshot) -> None:
+        self._snapshot = snapshot
+        # The bundle keeps pointing to current messages, for code formatting with it directly
+        self.translator._compiled_messages = snapshot.messages  # noqa: SLF001
+
+    def _notify(self, keys: set[str]) -> None:
+        # Called after the write lock is released, so listeners may read the translator
+        if keys:
+            for listener in tuple(self._change_listeners):
+                listener(self, keys)
+
+    @staticmethod
+    def _render_static(function: MessageFunction) -> str | None:
+        """Render a message without arguments once, and return the result if it doesn't depend on them,
+        nor on impure Fluent functions.
+        """
+        errors: list[Exception] = []
+        try:
+            text, impure = track_impure_calls(lambda: function({}, errors))
+        except Exception:  # noqa: BLE001
+            # Custom Fluent functions may fail on missing arguments, the message needs them anyway
+            return None
+        return None if errors or impure else text
 
     def __repr__(self) -> str:
         return f"<fluentogram.FluentTranslator instance, {self.locale!r}>"
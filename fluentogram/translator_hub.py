@@ -1,8 +1,12 @@
 from __future__ import annotations
 
 from collections.abc import Iterable, Mapping
+from typing import Any
 
+from fluentogram.cache import FormatCache
 from fluentogram.exceptions import RootTranslatorNotFoundError
+from fluentogram.functions import FluentFunctions
+from fluentogram.instrumentation import Instrumentation
 from fluentogram.runner import TranslatorRunner
 from fluentogram.storage import BaseStorage, MemoryStorage
 from fluentogram.translator import FluentTranslator
@@ -11,19 +15,27 @@ from fluentogram.translator import FluentTranslator
 class TranslatorHub:
     """This class implements a storage for all single-locale translators."""
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         locales_map: Mapping[str, str | Iterable[str]],
         translators: list[FluentTranslator] | None = None,
         root_locale: str = "en",
         separator: str = "-",
         storage: BaseStorage | None = None,
+        format_cache_size: int | None = None,
+        instrumentation: Instrumentation | None = None,
+        functions: FluentFunctions | None = None,
     ) -> None:
         self.root_locale = root_locale
         self.separator = separator
 
         self.storage = storage or MemoryStorage()
 
+        # Custom Fluent functions are used by updates, and by locales the storage hasn't compiled yet.
+        # Bundles of given translators have to be compiled with them, see FluentFunctions.bundle_functions()
+        if functions is not None:
+            self.storage.use_functions(functions)
+
         # Add translators to storage
         if translators is not None:
             self.storage.add_translators(translators)
@@ -34,27 +46,120 @@ class TranslatorHub:
         if not self.storage.has_translator(root_locale):
             raise RootTranslatorNotFoundError(self.root_locale)
 
+        # Opt-in cache of formatted messages, shared by all runners of the hub
+        self.format_cache = FormatCache(format_cache_size) if format_cache_size else None
+
+        self._runners: dict[str, TranslatorRunner] = {}
+        self._runners_storage: BaseStorage | None = None
+        self._runners_revision = -1
+        self._instrumentation = instrumentation
+
+    @property
+    def instrumentation(self) -> Instrumentation | None:
+        """Opt-in instrumentation of translation calls of all runners of the hub, None when disabled."""
+        return self._instrumentation
+
+    @instrumentation.setter
+    def instrumentation(self, instrumentation: Instrumentation | None) -> None:
+        self._instrumentation = instrumentation
+        for runner in self._runners.values():
+            runner._instrumentation = instrumentation  # noqa: SLF001
+
     async def update_translation(self, locale: str, key: str, value: str) -> bool:
         """Update translation for a given locale and key."""
         return await self.storage.update_translation(locale, key, value)
 
+    async def update_translations(self, locale: str, translations: Mapping[str, str]) -> bool:
+        """Update several translations for a given locale at once."""
+        return await self.storage.update_translations(locale, translations)
+
+    async def delete_translation(self, locale: str, key: str) -> bool:
+        """Delete updated translation for a given locale and key, restoring the original value."""
+        return await self.storage.delete_translation(locale, key)
+
+    async def delete_translations(self, locale: str, keys: Iterable[str]) -> bool:
+        """Delete several updated translations for a given locale at once, restoring the original values."""
+        return await self.storage.delete_translations(locale, keys)
+
+    def rollback_translations(self, locale: str, version: int | None = None) -> bool:
+        """Roll translations of a given locale back to the previous version, or to a kept version."""
+        return self.storage.rollback_translations(locale, version)
+
+    def missing_keys(self, locale: str, n: int | None = None) -> list[tuple[str, int]]:
+        """Keys looked up for a given locale, but missing in all of its translators, the most looked up first."""
+        return self.storage.get_missing_keys(locale).most_common(n)
+
     def get_translator_by_locale(self, locale: str) -> TranslatorRunner:
-        """Here is a little tricky moment.
-        There should be like a one-shot scheme.
-        For proper isolation, function returns TranslatorRunner new instance every time, not the same translator.
-        This trick makes "obj.attribute1.attribute2" access to be able.
-        You are able to do what you want, refer to the abstract class.
+        """Runners are immutable, so the hub hands out the same TranslatorRunner for every call with the same locale.
+        Cached runners are dropped as soon as the storage is replaced or its locales map is rebuilt.
+        Unknown locales are memoized too and share the root locale runner.
         """
+        if self._runners_storage is not self.storage or self._runners_revision != self.storage.revision:
+            self._reset_runners()
+
+        runner = self._runners.get(locale)
+        if runner is None:
+            runner = self._runners.setdefault(locale, self._create_runner(locale))
+        return runner
+
+    def pin(self, locale: str) -> TranslatorRunner:
+        """Get a runner of a locale over current versions of its translators, unaffected by later updates.
+        Use it for the length of a request, so every message of the request comes from the same versions.
+        """
+        return self.get_translator_by_locale(locale)._pin()  # noqa: SLF001
+
+    def _reset_runners(self) -> None:
+        self._runners = {}
+        if self.format_cache is not None:
+            self.format_cache.clear()
+            if self._runners_storage is not None:
+                self._runners_storage.remove_update_listener(self._invalidate_cached_key)
+            self.storage.add_update_listener(self._invalidate_cached_key)
+        self._runners_storage = self.storage
+        self._runners_revision = self.storage.revision
+
+    def _invalidate_cached_key(self, _: str, key: str) -> None:
+        if self.format_cache is not None:
+            self.format_cache.invalidate(key)
+
+    def _create_runner(self, locale: str) -> TranslatorRunner:
         translators = self.storage.get_translators_for_language(locale)
-        if not translators:
+        if not translators and locale != self.root_locale:
             # Fallback to root locale
-            translators = self.storage.get_translators_for_language(self.root_locale)
+            return self.get_translator_by_locale(self.root_locale)
 
         return TranslatorRunner(
             translators=translators,
             separator=self.separator,
+            format_cache=self.format_cache,
+            language=locale,
+            merged_messages=self.storage.get_merged_messages_ref(locale),
+            missing_keys=self.storage.get_missing_keys(locale),
+            instrumentation=self._instrumentation,
         )
 
+    def format_for_locales(self, key: str, items: Iterable[tuple[str, Mapping[str, Any]]]) -> list[str]:
+        """Format one key for a batch of (locale, kwargs) pairs.
+        Items are grouped by the runner serving their locale, so the key is resolved once per group.
+        The result keeps the order of items.
+        """
+        items = list(items)
+        groups: dict[TranslatorRunner, list[int]] = {}
+        for position, (locale, _) in enumerate(items):
+            groups.setdefault(self.get_translator_by_locale(locale), []).append(position)
+
+        texts = [""] * len(items)
+        for runner, positions in groups.items():
+            group_texts = runner.get_many((key, items[position][1]) for position in positions)
+            for position, text in zip(positions, group_texts):
+                texts[position] = text
+        return texts
+
+    @property
+    def functions(self) -> FluentFunctions | None:
+        """Custom Fluent functions of the storage."""
+        return self.storage.functions
+
     @property
     def translators(self) -> list[FluentTranslator]:
         """Get all translators from storage."""
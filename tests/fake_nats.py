@@ -0,0 +1,136 @@
+"""In-process fake of the NATS JetStream KV API surface used by NatsKvStorage"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Callable
+
+from nats.js.api import DeliverPolicy, KeyValueConfig
+from nats.js.errors import BucketNotFoundError
+from nats.js.kv import KV_DEL, KV_OP
+
+
+class FakeMsg:
+    def __init__(  # noqa: PLR0913
+        self,
+        subject: str,
+        data: bytes,
+        headers: dict[str, str] | None,
+        sequence: int,
+        num_pending: int,
+    ) -> None:
+        self.subject = subject
+        self.data = data
+        self.headers = headers
+        self.metadata = SimpleNamespace(
+            sequence=SimpleNamespace(stream=sequence),
+            num_pending=num_pending,
+            timestamp=datetime.now(timezone.utc),
+        )
+
+
+class FakeSubscription:
+    """Ordered push consumer: delivers queued stream positions to the callback one by one"""
+
+    def __init__(
+        self,
+        kv: FakeKv,
+        subject: str,
+        cb: Callable[[FakeMsg], Any],
+        deliver_policy: DeliverPolicy | None,
+    ) -> None:
+        self._kv = kv
+        self.subject = subject
+        self._cb = cb
+        positions = [position for position, (subject, _, _) in enumerate(kv.messages) if self.matches(subject)]
+        if deliver_policy == DeliverPolicy.LAST_PER_SUBJECT:
+            self._queue = sorted({kv.messages[position][0]: position for position in positions}.values())
+        else:
+            self._queue = positions
+        self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        self._task = asyncio.create_task(self._deliver())
+
+    def matches(self, subject: str) -> bool:
+        # Only trailing ">" wildcards are used by NatsKvStorage
+        return subject.startswith(self.subject[:-1])
+
+    def notify(self, position: int) -> None:
+        self._queue.append(position)
+        self._wakeup.set()
+
+    async def _deliver(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._queue:
+                position = self._queue.pop(0)
+                await self._cb(FakeMsg(*self._kv.messages[position], sequence=position + 1, num_pending=len(self._queue)))
+
+    async def consumer_info(self) -> Any:
+        return SimpleNamespace(num_pending=len(self._queue))
+
+    async def unsubscribe(self) -> None:
+        self._task.cancel()
+        self._kv.subscriptions.remove(self)
+
+
+class FakeKv:
+    def __init__(self, bucket: str = "fluentogram") -> None:
+        self.bucket = bucket
+        self._stream = f"KV_{bucket}"
+        self.messages: list[tuple[str, bytes, dict[str, str] | None]] = []
+        self.subscriptions: list[FakeSubscription] = []
+
+    def _append(self, key: str, value: bytes, headers: dict[str, str] | None) -> int:
+        self.messages.append((f"$KV.{self.bucket}.{key}", value, headers))
+        for subscription in self.subscriptions:
+            if subscription.matches(self.messages[-1][0]):
+                subscription.notify(len(self.messages) - 1)
+        return len(self.messages)
+
+    async def put(self, key: str, value: bytes) -> int:
+        return self._append(key, value, None)
+
+    async def delete(self, key: str) -> bool:
+        self._append(key, b"", {KV_OP: KV_DEL})
+        return True
+
+
+class FakeJetStream:
+    def __init__(self, kv: FakeKv) -> None:
+        self._kv = kv
+        self._nc = SimpleNamespace(close=self._close, jetstream=lambda: self)
+        self.created: list[str] = []
+
+    async def _close(self) -> None:
+        pass
+
+    async def key_value(self, bucket: str) -> FakeKv:
+        if bucket != self._kv.bucket:
+            raise BucketNotFoundError
+        return self._kv
+
+    async def create_key_value(self, config: KeyValueConfig) -> FakeKv:
+        self.created.append(config.bucket)
+        self._kv = FakeKv(config.bucket)
+        return self._kv
+
+    async def stream_info(self, name: str) -> Any:
+        return SimpleNamespace(config=SimpleNamespace(name=name))
+
+    async def subscribe(
+        self,
+        subject: str,
+        stream: str | None = None,
+        cb: Callable[[FakeMsg], Any] | None = None,
+        ordered_consumer: bool = False,  # noqa: FBT001, FBT002
+        deliver_policy: DeliverPolicy | None = None,
+    ) -> FakeSubscription:
+        assert ordered_consumer
+        assert cb is not None
+        subscription = FakeSubscription(self._kv, subject, cb, deliver_policy)
+        self._kv.subscriptions.append(subscription)
+        return subscription
@@ -161,3 +161,97 @@ def test_get_text_by_attribute_not_found() -> None:
     translator = translator_hub.get_translator_by_locale("en")
     with pytest.raises(KeyNotFoundError):
         translator.start.hello1()
+
+
+def test_runner_state_does_not_hide_message_keys() -> None:
+    keys = ("language", "format_cache", "keys_index", "merged_messages", "missing_keys", "instrumentation", "pin")
+    translator_hub = TranslatorHub(
+        {
+            "en": "en",
+        },
+        [
+            FluentTranslator(
+                "en",
+                translator=FluentBundle.from_string("en-US", "\n".join(f"{key} = {key}!" for key in keys)),
+            ),
+        ],
+        format_cache_size=10,
+    )
+    translator = translator_hub.get_translator_by_locale("en")
+    assert [getattr(translator, key)() for key in keys] == [f"{key}!" for key in keys]
+
+
+def test_attribute_paths_are_cached_and_reentrant() -> None:
+    translator_hub = TranslatorHub(
+        {
+            "en": "en",
+        },
+        [
+            FluentTranslator(
+                "en",
+                translator=FluentBundle.from_string("en-US", "start-hello = Hello\nstart-bye = Bye", use_isolating=False),
+            ),
+        ],
+    )
+    translator = translator_hub.get_translator_by_locale("en")
+    start = translator.start
+    assert start is translator.start
+    assert start.hello is translator.start.hello
+    # Unfinished paths don't leak into the next attribute access
+    assert start.bye() == "Bye"
+    assert translator.start.hello() == "Hello"
+
+
+def test_runners_are_cached_per_locale() -> None:
+    translator_hub = TranslatorHub(
+        {
+            "en": "en",
+            "ru": ("ru", "en"),
+        },
+        [
+            FluentTranslator(
+                "en",
+                translator=FluentBundle.from_string("en-US", "start-hello = Hello", use_isolating=False),
+            ),
+        ],
+    )
+    translator = translator_hub.get_translator_by_locale("ru")
+    assert translator is translator_hub.get_translator_by_locale("ru")
+    # Unknown locales share the root locale runner
+    assert translator_hub.get_translator_by_locale("fr") is translator_hub.get_translator_by_locale("en")
+
+    translator_hub.storage.set_locales_map({"en": "en", "ru": "en"})
+    assert translator is not translator_hub.get_translator_by_locale("ru")
+
+
+def test_batch_formatting() -> None:
+    translator_hub = TranslatorHub(
+        {
+            "en": "en",
+            "ru": ("ru", "en"),
+        },
+        [
+            FluentTranslator(
+                "en",
+                translator=FluentBundle.from_string(
+                    "en-US",
+                    "start-hello = Hello, { $username }\nstart-bye = Bye",
+                    use_isolating=False,
+                ),
+            ),
+            FluentTranslator(
+                "ru",
+                translator=FluentBundle.from_string("ru-RU", "start-hello = Привет, { $username }", use_isolating=False),
+            ),
+        ],
+    )
+    translator = translator_hub.get_translator_by_locale("ru")
+    assert translator.get_many([("start-hello", {"username": "Alex"}), ("start-bye", {})]) == ["Привет, Alex", "Bye"]
+
+    assert translator_hub.format_for_locales(
+        "start-hello",
+        [("en", {"username": "Alex"}), ("ru", {"username": "Bob"}), ("fr", {"username": "Eve"})],
+    ) == ["Hello, Alex", "Привет, Bob", "Hello, Eve"]
+
+    with pytest.raises(KeyNotFoundError):
+        translator.get_many([("start-hello1", {})])
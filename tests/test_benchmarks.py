@@ -0,0 +1,28 @@
+from pathlib import Path
+
+from benchmarks import cases  # noqa: F401
+from benchmarks.catalog import Catalog, CatalogSpec
+from benchmarks.harness import BENCHMARKS, compare, load, report_changes, run, save
+
+
+def test_catalog_fallback_coverage(tmp_path: Path) -> None:
+    catalog = Catalog(CatalogSpec(locales=2, keys=100, fallback_coverage=0.5))
+    assert len(catalog.locale_keys["en"]) == 100
+    assert 0 < len(catalog.fallback_keys("ru")) < 100
+
+    catalog.write(tmp_path)
+    assert len(list((tmp_path / "en").glob("*.ftl"))) == 50
+    translators = {translator.locale: translator for translator in catalog.translators()}
+    assert translators["ru"].has_key(catalog.locale_keys["ru"][0])
+
+
+def test_suite_runs_and_compares(tmp_path: Path) -> None:
+    catalog = Catalog(CatalogSpec(locales=2, keys=20))
+    report = run(catalog, rounds=1, log=lambda _: None)
+    assert set(report["results"]) | set(report["skipped"]) == set(BENCHMARKS)
+
+    save(report, tmp_path / "baseline.json")
+    baseline = load(tmp_path / "baseline.json")
+    baseline["results"]["runner.get"]["median"] = report["results"]["runner.get"]["median"] / 2
+    regressions = report_changes(compare(baseline, report), threshold=0.1, log=lambda _: None)
+    assert [change.name for change in regressions] == ["runner.get"]
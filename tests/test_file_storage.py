@@ -1,8 +1,16 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from threading import Thread
+from typing import Any
+
 import pytest
 from fluent_compiler.bundle import FluentBundle
 
-from fluentogram.exceptions import LocalesNotFoundError
+from fluentogram.exceptions import KeyNotFoundError, LocalesNotFoundError
 from fluentogram.storage import FileStorage
+from fluentogram.storage.compiled import compile_locale, load_compiled_locale
 from fluentogram.translator import FluentTranslator
 from fluentogram.translator_hub import TranslatorHub
 
@@ -40,3 +48,119 @@ def test_file_storage_if_translators_passed() -> None:
 def test_file_storage_if_no_locales_found() -> None:
     with pytest.raises(LocalesNotFoundError):
         FileStorage("tests")
+
+
+def test_lazy_file_storage() -> None:
+    storage = FileStorage("tests/assets/locales/{locale}/", lazy=True)
+    compiled: list[str] = []
+    load_locale = storage._load_locale
+
+    def counting_load_locale(locale: str, paths: list) -> FluentTranslator:
+        compiled.append(locale)
+        return load_locale(locale, paths)
+
+    storage._load_locale = counting_load_locale  # type: ignore[method-assign]
+    hub = TranslatorHub(
+        {
+            "en": "en",
+        },
+        storage=storage,
+    )
+    assert compiled == []
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        translators = list(executor.map(lambda _: hub.get_translator_by_locale("en"), range(8)))
+    assert compiled == ["en"]
+    assert translators[0].get("hello") == "Hello, world!"
+
+
+def test_lazy_language_added_while_translator_updates() -> None:
+    storage = FileStorage("tests/assets/locales/{locale}/", lazy=True)
+    hub = TranslatorHub({"en": "en", "uk": ("uk", "en")}, storage=storage)
+    hub.get_translator_by_locale("en")
+    translator = storage.get_translator("en")
+    assert translator is not None
+    remerge_keys = storage._remerge_keys
+    threads: list[Thread] = []
+
+    def remerge_while_adding_language(*args: Any) -> Any:
+        if not threads:
+            # Another thread adds a language, while the update remerges languages
+            threads.append(Thread(target=hub.get_translator_by_locale, args=("uk",)))
+            threads[0].start()
+            threads[0].join(0.1)
+        return remerge_keys(*args)
+
+    storage._remerge_keys = remerge_while_adding_language  # type: ignore[method-assign]
+    translator.apply(translator.compile_translations({"hello": "Hi"}))
+    threads[0].join()
+    assert hub.get_translator_by_locale("uk").get("hello") == "Hi"
+
+
+def test_file_storage_compiled_in_worker_processes() -> None:
+    storage = FileStorage("tests/assets/locales/{locale}/", workers=2)
+    hub = TranslatorHub(
+        {
+            "en": "en",
+        },
+        storage=storage,
+    )
+    translator = hub.get_translator_by_locale("en")
+    assert translator.get("hello") == "Hello, world!"
+
+
+def test_compiled_locale_matches_fluent_bundle() -> None:
+    text = Path("tests/assets/test.ftl").read_text(encoding="utf8")
+    bundle = FluentBundle.from_string("en", text, use_isolating=False)
+    loaded = load_compiled_locale(compile_locale("en", text))
+
+    assert loaded._compiled_messages.keys() == bundle._compiled_messages.keys()
+    args = {"name": "Alex", "unreadCount": 3, "date": datetime(2024, 1, 15, tzinfo=timezone.utc), "points": 5, "notAVar": "x"}
+    for key in bundle._compiled_messages:
+        assert loaded.format(key, args) == bundle.format(key, args)
+
+
+def test_file_storage_compiled_cache(tmp_path: Path) -> None:
+    locales_path = tmp_path / "locales"
+    (locales_path / "en").mkdir(parents=True)
+    (locales_path / "en" / "main.ftl").write_text("hello = Hello, world!", encoding="utf8")
+    cache_dir = tmp_path / "cache"
+
+    FileStorage(locales_path, cache_dir=cache_dir, lazy=True).populate_cache()
+    assert len(list(cache_dir.iterdir())) == 1
+
+    storage = FileStorage(locales_path, cache_dir=cache_dir)
+    storage._cache.put = None  # cache hits must not be written again
+    assert storage.get_translator("en").get("hello") == "Hello, world!"
+
+    (locales_path / "en" / "main.ftl").write_text("hello = Hello, cache!", encoding="utf8")
+    storage = FileStorage(locales_path, cache_dir=cache_dir)
+    assert storage.get_translator("en").get("hello") == "Hello, cache!"
+    assert len(list(cache_dir.iterdir())) == 1
+
+
+def _write_ftl(path: Path, text: str, mtime: int) -> None:
+    path.write_text(text, encoding="utf8")
+    os.utime(path, (mtime, mtime))
+
+
+def test_file_storage_reloads_changed_files(tmp_path: Path) -> None:
+    (tmp_path / "en").mkdir()
+    _write_ftl(tmp_path / "en" / "a.ftl", "hello = Hello\nbye = Bye", mtime=1)
+    _write_ftl(tmp_path / "en" / "b.ftl", "-brand = Fluentogram\ngreet = { hello }, { $name }! { -brand }", mtime=1)
+    storage = FileStorage(tmp_path, watch=True)
+    hub = TranslatorHub({"en": "en"}, storage=storage)
+    translator = hub.get_translator_by_locale("en")
+    assert translator.get("greet", name="Alex") == "Hello, Alex! Fluentogram"
+    assert storage.reload_changed() == {}
+
+    _write_ftl(tmp_path / "en" / "a.ftl", "hello = Hi", mtime=2)
+    assert storage.reload_changed() == {"en": {"hello", "bye", "greet"}}
+    assert translator.get("hello") == "Hi"
+    assert translator.get("greet", name="Alex") == "Hi, Alex! Fluentogram"
+    with pytest.raises(KeyNotFoundError):
+        translator.get("bye")
+
+    _write_ftl(tmp_path / "en" / "b.ftl", "-brand = Brand\ngreet = { hello }, { $name }! { -brand }", mtime=2)
+    assert storage.reload_changed() == {"en": {"greet"}}
+    assert translator.get("greet", name="Alex") == "Hi, Alex! Brand"
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fluent_compiler.bundle import FluentBundle
+
+from fluentogram import FluentTranslator, MoneyTransformer, TranslatorHub
+from fluentogram.cache import FormatCache
+
+
+def _hub(format_cache_size: int = 2) -> TranslatorHub:
+    return TranslatorHub(
+        {
+            "en": "en",
+        },
+        [
+            FluentTranslator(
+                "en",
+                translator=FluentBundle.from_string(
+                    "en-US",
+                    "hello = Hello, { $name }\nprice = { $amount }\ntime = At { DATETIME($time, timeStyle: \"short\") }",
+                    use_isolating=False,
+                ),
+            ),
+        ],
+        format_cache_size=format_cache_size,
+    )
+
+
+def test_format_cache_hits_and_evicts() -> None:
+    hub = _hub()
+    translator = hub.get_translator_by_locale("en")
+    assert hub.format_cache is not None
+
+    assert translator.get("hello", name="Alex") == "Hello, Alex"
+    assert translator.hello(name="Alex") == "Hello, Alex"
+    assert hub.format_cache.info() == (1, 1, 2, 1)
+
+    translator.get("hello", name="Bob")
+    translator.get("hello", name="Eve")
+    assert len(hub.format_cache) == 2
+    translator.get("hello", name="Alex")
+    assert hub.format_cache.misses == 4
+
+
+def test_format_cache_keeps_formatting_options_apart() -> None:
+    translator = _hub().get_translator_by_locale("en")
+    usd = translator.get("price", amount=MoneyTransformer(1, currency="USD", currency_display="symbol"))
+    eur = translator.get("price", amount=MoneyTransformer(1, currency="EUR", currency_display="symbol"))
+    assert usd != eur
+
+
+def test_format_cache_skips_unhashable_kwargs() -> None:
+    assert FormatCache.make_key("en", "hello", {"name": ["Alex"]}) is None
+
+
+@pytest.mark.asyncio
+async def test_format_cache_invalidated_on_update() -> None:
+    hub = _hub()
+    translator = hub.get_translator_by_locale("en")
+    translator.get("hello", name="Alex")
+    translator.get("price", amount=1)
+
+    await hub.update_translation("en", "hello", "Hi")
+    assert len(hub.format_cache) == 1
+    assert translator.get("hello", name="Alex") == "Hi"
+
+
+def test_format_cache_keeps_equal_values_with_different_texts_apart() -> None:
+    translator = _hub(format_cache_size=10).get_translator_by_locale("en")
+    noon = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+    # Equal values, which are formatted differently
+    assert translator.get("time", time=noon) == "At 12:00\u202fPM"
+    assert translator.get("time", time=noon.astimezone(timezone(timedelta(hours=3)))) == "At 3:00\u202fPM"
+    assert [translator.get("price", amount=0.0), translator.get("price", amount=-0.0)] == ["0", "-0"]
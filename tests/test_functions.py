@@ -0,0 +1,121 @@
+from pathlib import Path
+
+import pytest
+from fluent_compiler.bundle import FluentBundle
+
+from fluentogram import FluentFunctions, FluentTranslator, TranslatorHub
+from fluentogram.exceptions import FormatError
+from fluentogram.storage import FileStorage
+
+calls: list[str] = []
+
+
+def byte_size(size: int) -> str:
+    calls.append("BYTES")
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:  # noqa: PLR2004
+            return f"{size} {unit}"
+        size //= 1024
+    return f"{size} GB"
+
+
+def _functions() -> FluentFunctions:
+    functions = FluentFunctions()
+    functions.add("BYTES", byte_size, memoize=True)
+
+    @functions.register()
+    def ticket() -> str:
+        calls.append("TICKET")
+        return f"#{len(calls)}"
+
+    return functions
+
+
+@pytest.fixture(autouse=True)
+def _reset_calls() -> None:
+    calls.clear()
+
+
+def test_memoized_function() -> None:
+    functions = _functions()
+    translator = FluentTranslator(
+        "en",
+        FluentBundle.from_string(
+            "en",
+            "size = Size: { BYTES($size) }",
+            functions=functions.bundle_functions(),
+            use_isolating=False,
+        ),
+    )
+    hub = TranslatorHub({"en": "en"}, [translator], functions=functions)
+    runner = hub.get_translator_by_locale("en")
+    # The translator has probed the message without arguments
+    calls.clear()
+
+    assert [runner.size(size=2048), runner.size(size=2048), runner.size(size=10)] == [
+        "Size: 2 KB",
+        "Size: 2 KB",
+        "Size: 10 B",
+    ]
+    assert calls == ["BYTES", "BYTES"]
+    assert functions.cache_info("BYTES").hits == 1
+    assert functions.cache_info("TICKET") is None
+
+
+def test_impure_function_is_not_prerendered_nor_cached() -> None:
+    functions = _functions()
+    translator = FluentTranslator(
+        "en",
+        FluentBundle.from_string(
+            "en",
+            "queue = You are { TICKET() }",
+            functions=functions.bundle_functions(),
+            use_isolating=False,
+        ),
+    )
+    hub = TranslatorHub({"en": "en"}, [translator], functions=functions, format_cache_size=100)
+    runner = hub.get_translator_by_locale("en")
+
+    assert [runner.queue(), runner.queue()] == ["You are #2", "You are #3"]
+
+
+@pytest.mark.asyncio
+async def test_updates_are_compiled_with_functions() -> None:
+    hub = TranslatorHub(
+        {"en": "en"},
+        [FluentTranslator("en", FluentBundle.from_string("en", "size = Size"))],
+        functions=_functions(),
+    )
+    await hub.update_translation("en", "size", "Size: { BYTES($size) }")
+    # Updates are compiled with isolation marks around placeables
+    assert hub.get_translator_by_locale("en").size(size=3 * 1024 * 1024) == "Size: \u20683 MB\u2069"
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_file_storage_compiles_with_functions(tmp_path: Path, lazy: bool) -> None:  # noqa: FBT001
+    (tmp_path / "locales" / "en").mkdir(parents=True)
+    (tmp_path / "locales" / "en" / "main.ftl").write_text("size = Size: { BYTES($size) }\n", encoding="utf8")
+    cache_dir = tmp_path / "cache"
+
+    # Without functions, the call compiles to an error, and the artifact is cached
+    storage = FileStorage(tmp_path / "locales", cache_dir=cache_dir)
+    with pytest.raises(FormatError):
+        TranslatorHub({"en": "en"}, storage=storage).get_translator_by_locale("en").size(size=5)
+
+    # The cached artifact isn't reused once functions are registered.
+    # A lazy storage takes functions of the hub, and compiles the locale on first use
+    storage = FileStorage(tmp_path / "locales", lazy=lazy, cache_dir=cache_dir, functions=None if lazy else _functions())
+    hub = TranslatorHub({"en": "en"}, storage=storage, functions=_functions() if lazy else None)
+    assert hub.get_translator_by_locale("en").size(size=5) == "Size: 5 B"
+
+
+def test_hub_rejects_other_functions_of_storage(tmp_path: Path) -> None:
+    (tmp_path / "en").mkdir()
+    (tmp_path / "en" / "main.ftl").write_text("hello = Hello\n", encoding="utf8")
+    with pytest.raises(ValueError, match="other Fluent functions"):
+        TranslatorHub({"en": "en"}, storage=FileStorage(tmp_path, functions=_functions()), functions=_functions())
+
+
+def test_invalid_function_name() -> None:
+    with pytest.raises(ValueError, match="Invalid Fluent function name"):
+        FluentFunctions({"bytes": byte_size})
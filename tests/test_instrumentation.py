@@ -0,0 +1,63 @@
+import pytest
+from fluent_compiler.bundle import FluentBundle
+
+from fluentogram import FluentTranslator, TranslatorHub
+from fluentogram.exceptions import FormatError, KeyNotFoundError
+from fluentogram.instrumentation import CallRecord, Instrumentation
+
+
+def _hub() -> TranslatorHub:
+    return TranslatorHub(
+        {"en": "en", "ru": ("ru", "en")},
+        [
+            FluentTranslator("en", translator=FluentBundle.from_string("en-US", "hello = Hello\nbye = Bye, { $name }")),
+            FluentTranslator("ru", translator=FluentBundle.from_string("ru-RU", "hello = Privet")),
+        ],
+    )
+
+
+def test_disabled_by_default() -> None:
+    hub = _hub()
+    assert hub.instrumentation is None
+    assert hub.get_translator_by_locale("ru").hello() == "Privet"
+
+
+def test_records_calls() -> None:
+    hub = _hub()
+    translator = hub.get_translator_by_locale("ru")
+    instrumentation = Instrumentation(top_n=2)
+    records: list[CallRecord] = []
+    instrumentation.add_listener(records.append)
+    hub.instrumentation = instrumentation
+
+    translator.hello()
+    translator.hello()
+    translator.bye(name="Alex")
+    with pytest.raises(FormatError):
+        translator.bye()
+    with pytest.raises(KeyNotFoundError):
+        translator.missing()
+
+    snapshot = instrumentation.snapshot()
+    assert snapshot.calls == {("ru", "hello"): 2, ("ru", "bye"): 2, ("ru", "missing"): 1}
+    assert snapshot.fallback_depth == {0: 2, 1: 2}
+    assert snapshot.format_time.count == 5
+    assert (snapshot.format_errors, snapshot.key_not_found) == (1, 1)
+    assert len(snapshot.slowest) == 2
+    assert len(records) == 5
+    assert records[-1].depth is None
+
+
+def test_sampling() -> None:
+    hub = _hub()
+    hub.instrumentation = instrumentation = Instrumentation(sample_rate=0.0)
+    hub.get_translator_by_locale("en").hello()
+    assert instrumentation.snapshot().calls == {}
+
+
+def test_records_batch_calls() -> None:
+    hub = _hub()
+    hub.instrumentation = instrumentation = Instrumentation()
+    hub.get_translator_by_locale("ru").get_many([("hello", {}), ("bye", {"name": "Alex"})])
+    hub.format_for_locales("hello", [("en", {}), ("ru", {})])
+    assert instrumentation.snapshot().calls == {("ru", "hello"): 2, ("ru", "bye"): 1, ("en", "hello"): 1}
@@ -0,0 +1,320 @@
+import asyncio
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+from fluent_compiler.bundle import FluentBundle
+from nats.js.errors import BucketNotFoundError
+
+from fluentogram import FluentTranslator, TranslatorHub
+from fluentogram.nats import bulk
+from fluentogram.nats.bulk import read_translations
+from fluentogram.nats.metrics import BatchStats
+from fluentogram.nats.storage import NatsKvStorage
+from tests.fake_nats import FakeJetStream, FakeKv
+
+
+async def _wait_for(condition: Callable[[], bool], timeout: float = 1.0) -> None:
+    async def wait() -> None:
+        while not condition():
+            await asyncio.sleep(0.001)
+
+    await asyncio.wait_for(wait(), timeout)
+
+
+@pytest.mark.asyncio
+async def test_initial_sync_applies_latest_values() -> None:
+    kv = FakeKv()
+    await kv.put("en.hello", b'"Hello 1"')
+    await kv.put("en.hello", b'"Hello 2"')
+    await kv.put("ru.hello", b'"Privet"')
+    js = FakeJetStream(kv)
+
+    storage = NatsKvStorage(kv, js, consume_timeout=0.01)
+    update_compiled_messages = storage._update_compiled_messages
+    batches: list[int] = []
+
+    async def counting_update_compiled_messages(messages: list) -> None:
+        batches.append(len(messages))
+        await update_compiled_messages(messages)
+
+    storage._update_compiled_messages = counting_update_compiled_messages
+    await storage.ready()
+    assert batches == [2]
+
+    hub = TranslatorHub(
+        {"en": "en", "ru": ("ru", "en")},
+        [
+            FluentTranslator("en", translator=FluentBundle.from_string("en-US", "hello = Hi")),
+            FluentTranslator("ru", translator=FluentBundle.from_string("ru-RU", "bye = Poka")),
+        ],
+        storage=storage,
+    )
+    assert hub.get_translator_by_locale("en").get("hello") == "Hello 2"
+    assert hub.get_translator_by_locale("ru").get("hello") == "Privet"
+
+    await storage.update_translation("en", "hello", "Hey")
+    translator = hub.get_translator_by_locale("en")
+    await _wait_for(lambda: translator.get("hello") == "Hey" and storage.last_apply_latency is not None)
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_ready_on_empty_bucket() -> None:
+    kv = FakeKv()
+    storage = NatsKvStorage(kv, FakeJetStream(kv))
+    await asyncio.wait_for(storage.ready(), 1)
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_burst_is_coalesced_and_compiled_once() -> None:
+    kv = FakeKv()
+    storage = NatsKvStorage(kv, FakeJetStream(kv), debounce=0.05)
+    await storage.ready()
+    translator = FluentTranslator("en", translator=FluentBundle.from_string("en-US", "hello = Hi"))
+    storage.add_translator(translator)
+
+    compiled: list[dict[str, str]] = []
+    compile_translations = translator.compile_translations
+
+    def counting_compile_translations(translations: dict[str, str]) -> dict:
+        compiled.append(dict(translations))
+        return compile_translations(translations)
+
+    translator.compile_translations = counting_compile_translations
+    for i in range(100):
+        await storage.update_translation("en", "hello", f"Hello {i}")
+    await storage.update_translation("en", "bye", "Bye")
+
+    await _wait_for(lambda: translator.get("bye") == "Bye")
+    assert compiled == [{"hello": "Hello 99", "bye": "Bye"}]
+    assert translator.get("hello") == "Hello 99"
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_broken_value_does_not_block_batch() -> None:
+    kv = FakeKv()
+    storage = NatsKvStorage(kv, FakeJetStream(kv), debounce=0.05)
+    await storage.ready()
+    translator = FluentTranslator("en", translator=FluentBundle.from_string("en-US", "hello = Hi"))
+    storage.add_translator(translator)
+
+    await storage.update_translations("en", {"hello": "{ broken", "bye": "Bye"})
+    await _wait_for(lambda: translator.get("bye") == "Bye")
+    assert translator.get("hello") == "Hi"
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_delete_restores_base_value() -> None:
+    kv = FakeKv()
+    storage = NatsKvStorage(kv, FakeJetStream(kv))
+    await storage.ready()
+    hub = TranslatorHub(
+        {"en": "en", "ru": ("ru", "en")},
+        [
+            FluentTranslator("en", translator=FluentBundle.from_string("en-US", "hello = Hi\nbye = Bye")),
+            FluentTranslator("ru", translator=FluentBundle.from_string("ru-RU", "hello = Privet")),
+        ],
+        storage=storage,
+    )
+    translator = hub.get_translator_by_locale("ru")
+
+    await storage.update_translations("ru", {"hello": "Zdravstvuy", "bye": "Poka"})
+    await _wait_for(lambda: translator.get("bye") == "Poka")
+    assert translator.get("hello") == "Zdravstvuy"
+
+    await storage.delete_translations("ru", ["hello", "bye"])
+    await _wait_for(lambda: translator.get("bye") == "Bye")
+    assert translator.get("hello") == "Privet"
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_subscriptions_follow_served_locales() -> None:
+    kv = FakeKv()
+    await kv.put("en.hello", b'"Hello"')
+    await kv.put("de.hello", b'"Hallo"')
+    storage = NatsKvStorage(kv, FakeJetStream(kv), locales=["en"])
+    await storage.ready()
+    assert [subscription.subject for subscription in kv.subscriptions] == ["$KV.fluentogram.en.>"]
+
+    translator = FluentTranslator("ru", translator=FluentBundle.from_string("ru-RU", "hello = Privet"))
+    storage.add_translator(translator)
+    await _wait_for(lambda: len(kv.subscriptions) == 2)
+    assert sorted(subscription.subject for subscription in kv.subscriptions) == [
+        "$KV.fluentogram.en.>",
+        "$KV.fluentogram.ru.>",
+    ]
+
+    await storage.update_translation("ru", "hello", "Zdravstvuy")
+    await _wait_for(lambda: translator.get("hello") == "Zdravstvuy")
+    assert "de" not in storage._pending_translations
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_subscription_is_retried() -> None:
+    kv = FakeKv()
+    await kv.put("en.hello", b'"Hello"')
+    js = FakeJetStream(kv)
+    en = FluentTranslator("en", translator=FluentBundle.from_string("en-US", "hello = Hi"))
+    storage = NatsKvStorage(kv, js)
+    storage.add_translator(en)
+    storage.sync_retry_delay = 0.01
+    await storage.ready()
+
+    stream_info = js.stream_info
+    failures = []
+
+    async def failing_stream_info(name: str) -> Any:
+        if not failures:
+            failures.append(name)
+            raise RuntimeError("stream info")
+        return await stream_info(name)
+
+    js.stream_info = failing_stream_info
+    ru = FluentTranslator("ru", translator=FluentBundle.from_string("ru-RU", "hello = Privet"))
+    storage.add_translator(ru)
+    # Changes of served locales are still applied, while the new locale is subscribed again
+    await storage.update_translation("en", "hello", "Hey")
+    await _wait_for(lambda: en.get("hello") == "Hey")
+    await _wait_for(lambda: len(kv.subscriptions) == 2)
+    assert failures
+    assert not storage._listen_for_changes_task.done()
+
+    await storage.update_translation("ru", "hello", "Zdravstvuy")
+    await _wait_for(lambda: ru.get("hello") == "Zdravstvuy")
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_pending_values_of_unserved_locales_are_dropped() -> None:
+    kv = FakeKv()
+    await kv.put("en.hello", b'"Hello"')
+    await kv.put("de.hello", b'"Hallo"')
+    storage = NatsKvStorage(kv, FakeJetStream(kv))
+    await storage.ready()
+    assert set(storage._pending_translations) == {"en", "de"}
+
+    translator = FluentTranslator("en", translator=FluentBundle.from_string("en-US", "hello = Hi"))
+    storage.add_translator(translator)
+    assert translator.get("hello") == "Hello"
+    await _wait_for(lambda: [subscription.subject for subscription in kv.subscriptions] == ["$KV.fluentogram.en.>"])
+    assert storage._pending_translations == {}
+
+    await kv.put("de.bye", b'"Tschuss"')
+    await storage.update_translation("en", "hello", "Hey")
+    await _wait_for(lambda: translator.get("hello") == "Hey")
+    assert storage._pending_translations == {}
+    await storage.close()
+
+
+def test_read_translations_keeps_values_of_commented_entries(tmp_path: Path) -> None:
+    (tmp_path / "en").mkdir()
+    text = (Path(__file__).parent / "assets" / "test.ftl").read_text(encoding="utf8")
+    (tmp_path / "en" / "main.ftl").write_text(text, encoding="utf8")
+    translations = read_translations(tmp_path)["en"]
+    assert translations["hello"] == "Hello, world!"
+
+    # Values pushed one by one compile back to the same messages
+    original = FluentBundle.from_string("en-US", text)._compiled_messages
+    pushed = FluentBundle.from_string("en-US", "\n".join(f"{key} = {value}" for key, value in translations.items()))
+    assert pushed._compiled_messages.keys() == original.keys()
+    for key, function in original.items():
+        assert pushed._compiled_messages[key]({}, []) == function({}, [])
+
+
+@pytest.mark.asyncio
+async def test_bulk_put_pushes_changed_values(tmp_path: Path) -> None:
+    for locale, text in {
+        "en": (
+            "-brand = Bot\nhello = Hello, { $name }!\nwelcome = Welcome to { -brand }!\n"
+            "about =\n    First line\n    Second line\n    .title = About\n"
+        ),
+        "ru": "hello = Privet, { $name }!\n",
+    }.items():
+        (tmp_path / locale).mkdir()
+        (tmp_path / locale / "main.ftl").write_text(text, encoding="utf8")
+    translations = read_translations(tmp_path)
+    assert set(translations["en"]) == {"-brand", "hello", "welcome", "about"}
+
+    kv = FakeKv()
+    await kv.put("ru.hello", b'"Privet, { $name }!"')
+    storage = NatsKvStorage(kv, FakeJetStream(kv))
+    await storage.ready()
+    translator = FluentTranslator("en", translator=FluentBundle.from_string("en-US", "hello = Hi", use_isolating=False))
+    storage.add_translator(translator)
+
+    result = await storage.bulk_put(translations, concurrency=2)
+    assert (result.total, result.changed) == (5, 4)
+    await _wait_for(lambda: translator.has_key("about.title") and translator.has_key("welcome"))
+    assert translator.get("about") == "First line\nSecond line"
+    assert translator.get("about.title") == "About"
+    assert translator.get("welcome") == "Welcome to \u2068Bot\u2069!"
+    assert not translator.has_key("-brand")
+
+    result = await storage.bulk_put(translations)
+    assert (result.total, result.changed) == (5, 0)
+
+    # Messages are compiled with current terms, and compiled again when a term changes
+    await storage.update_translation("en", "welcome", "Hi from { -brand }!")
+    await _wait_for(lambda: translator.get("welcome") == "Hi from \u2068Bot\u2069!")
+    await storage.update_translation("en", "greeting", "{ welcome } { hello }")
+    await _wait_for(lambda: translator.has_key("greeting"))
+    changed: list[set[str]] = []
+    translator.add_change_listener(lambda _, keys: changed.append(set(keys)))
+    await storage.update_translation("en", "-brand", "Acme")
+    await _wait_for(lambda: translator.get("welcome") == "Hi from \u2068Acme\u2069!")
+    # Only messages referencing the term are compiled again, referenced "hello" stays as it is
+    assert changed == [{"welcome", "greeting"}]
+    assert translator.get("greeting", name="Bob") == (
+        "\u2068Hi from \u2068Acme\u2069!\u2069 \u2068Hello, \u2068Bob\u2069!\u2069"
+    )
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_push_opens_existing_bucket(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    (tmp_path / "en").mkdir()
+    (tmp_path / "en" / "main.ftl").write_text("hello = Hello\n", encoding="utf8")
+    js = FakeJetStream(FakeKv("translations"))
+
+    async def connect(**_: object) -> object:
+        return js._nc
+
+    monkeypatch.setattr(bulk, "connect", connect)
+    assert (await bulk.push(tmp_path, [], "translations")).changed == 1
+    assert js.created == []
+
+    with pytest.raises(BucketNotFoundError):
+        await bulk.push(tmp_path, [], "other")
+    assert (await bulk.push(tmp_path, [], "other", create=True)).changed == 1
+    assert js.created == ["other"]
+
+
+@pytest.mark.asyncio
+async def test_stats_track_applied_batches() -> None:
+    kv = FakeKv()
+    await kv.put("en.hello", b'"Hello"')
+    storage = NatsKvStorage(kv, FakeJetStream(kv), locales=["en"])
+    batches: list[BatchStats] = []
+    storage.metrics.add_batch_listener(batches.append)
+    await storage.ready()
+    translator = FluentTranslator("en", translator=FluentBundle.from_string("en-US", "hello = Hi"))
+    storage.add_translator(translator)
+
+    await storage.update_translations("en", {"hello": "Hey", "bye": "{ broken"})
+    await _wait_for(lambda: storage.stats().changes_applied == 3)
+
+    stats = storage.stats()
+    assert (stats.applied_sequence, stats.head_sequence, stats.lag) == (3, 3, 0)
+    assert stats.errors == 1
+    assert stats.apply_latency.count == 2
+    assert stats.batch_size.count == 2
+    assert [batch.size for batch in batches] == [1, 2]
+    assert batches[0].latencies == ()
+    assert batches[1].errors == 1
+    await storage.close()
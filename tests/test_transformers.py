@@ -1,4 +1,4 @@
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 
 from fluent_compiler.bundle import FluentBundle
@@ -51,3 +51,39 @@ def test_money_transformer() -> None:
     amount = Decimal("123456.78")
     formatted_amount = MoneyTransformer(amount, currency="USD", currency_display="symbol")
     assert translator.get("amount-message", amount=formatted_amount) == "You have $123456.78"
+
+
+def test_money_transformer_many() -> None:
+    translator = FluentTranslator(
+        "en",
+        translator=FluentBundle.from_string(
+            "en-US",
+            "price = { $amount }\ngrouped-price = { NUMBER($amount, useGrouping: 1) }",
+            use_isolating=False,
+        ),
+    )
+    amounts = [Decimal("1"), Decimal("1.00"), Decimal("1234.5"), 2]
+
+    numbers = MoneyTransformer.many(amounts, currency="EUR", currency_display="name")
+    assert [translator.get("price", amount=number) for number in numbers] == [
+        "1.00 euro",
+        "1.00 euros",
+        "1234.50 euros",
+        "2.00 euros",
+    ]
+    # Formatted texts are cached per value, but options given in the message still apply
+    assert translator.get("grouped-price", amount=numbers[2]) == "1,234.50 euros"
+    assert MoneyTransformer.format_many(amounts, "ru-RU", currency="RUB", currency_display="symbol") == [
+        "1,00\xa0₽",
+        "1,00\xa0₽",
+        "1234,50\xa0₽",
+        "2,00\xa0₽",
+    ]
+
+
+def test_date_transformer_many() -> None:
+    utc = datetime(2024, 1, 15, 14, 30, tzinfo=timezone.utc)
+    # Same moment in another time zone
+    moscow = utc.astimezone(timezone(timedelta(hours=3)))
+    texts = DateTimeTransformer.format_many([utc, moscow], "en-US", timeStyle="short")
+    assert [text[:4] for text in texts] == ["2:30", "5:30"]
@@ -3,6 +3,7 @@ import pytest
 from fluent_compiler.bundle import FluentBundle
 
 from fluentogram import FluentTranslator, TranslatorHub
+from fluentogram.exceptions import KeyNotFoundError
 
 
 @pytest.mark.asyncio
@@ -48,3 +49,241 @@ async def test_update_translation_after_fallback() -> None:
 
     await translator_hub.storage.update_translation("ru", "start-hello1", "Привет1")
     assert translator.get("start-hello1") == "Привет1"
+
+
+@pytest.mark.asyncio
+async def test_keys_index_follows_updates() -> None:
+    en = FluentTranslator("en", translator=FluentBundle.from_string("en-US", "start-hello = Hello"))
+    ru = FluentTranslator("ru", translator=FluentBundle.from_string("ru-RU", "start-bye = Пока"))
+    translator_hub = TranslatorHub({"en": "en", "ru": ("ru", "en")}, [en, ru])
+    keys_index = translator_hub.storage.get_keys_index("ru")
+    assert keys_index["start-hello"] is en
+    assert keys_index["start-bye"] is ru
+
+    await translator_hub.storage.update_translation("ru", "start-hello", "Привет")
+    # The index is replaced as a whole, the previous one stays unchanged
+    assert keys_index["start-hello"] is en
+    assert translator_hub.storage.get_keys_index("ru")["start-hello"] is ru
+    assert translator_hub.storage.get_keys_index("en")["start-hello"] is en
+
+
+@pytest.mark.asyncio
+async def test_update_static_translation() -> None:
+    translator_hub = TranslatorHub(
+        {
+            "en": "en",
+        },
+        [
+            FluentTranslator(
+                "en",
+                translator=FluentBundle.from_string("en-US", "start-hello = Hello", use_isolating=False),
+            ),
+        ],
+    )
+    translator = translator_hub.get_translator_by_locale("en")
+    assert translator.get("start-hello") == "Hello"
+
+    await translator_hub.storage.update_translation("en", "start-hello", "Hello, { $name }")
+    assert "Alex" in translator.get("start-hello", name="Alex")
+
+    await translator_hub.storage.update_translation("en", "start-hello", "Hi")
+    assert translator.get("start-hello") == "Hi"
+
+
+@pytest.mark.asyncio
+async def test_update_translations() -> None:
+    translator_hub = TranslatorHub(
+        {
+            "en": "en",
+        },
+        [
+            FluentTranslator(
+                "en",
+                translator=FluentBundle.from_string("en-US", "start-hello = Hello"),
+            ),
+        ],
+    )
+    translator = translator_hub.get_translator_by_locale("en")
+
+    assert await translator_hub.update_translations("en", {"start-hello": "Hi", "start-bye": "Bye"})
+    assert translator.get("start-hello") == "Hi"
+    assert translator.start.bye() == "Bye"
+    assert not await translator_hub.update_translations("de", {"start-hello": "Hallo"})
+
+
+@pytest.mark.asyncio
+async def test_delete_translations_restores_base_values() -> None:
+    translator_hub = TranslatorHub(
+        {
+            "en": "en",
+            "ru": ("ru", "en"),
+        },
+        [
+            FluentTranslator(
+                "en",
+                translator=FluentBundle.from_string("en-US", "start-hello = Hello\nstart-bye = Bye"),
+            ),
+            FluentTranslator(
+                "ru",
+                translator=FluentBundle.from_string("ru-RU", "start-hello = Привет"),
+            ),
+        ],
+    )
+    translator = translator_hub.get_translator_by_locale("ru")
+
+    await translator_hub.update_translations("ru", {"start-hello": "Здравствуйте", "start-bye": "Пока"})
+    assert translator.get("start-hello") == "Здравствуйте"
+    assert translator.get("start-bye") == "Пока"
+
+    assert await translator_hub.delete_translations("ru", ["start-hello", "start-bye"])
+    assert translator.get("start-hello") == "Привет"
+    assert translator.get("start-bye") == "Bye"
+    assert not await translator_hub.delete_translation("de", "start-hello")
+
+
+@pytest.mark.asyncio
+async def test_pinned_runner_and_rollback() -> None:
+    translator_hub = TranslatorHub(
+        {
+            "en": "en",
+        },
+        [
+            FluentTranslator(
+                "en",
+                translator=FluentBundle.from_string("en-US", "start-hello = Hello", use_isolating=False),
+            ),
+        ],
+    )
+    translator = translator_hub.get_translator_by_locale("en")
+    pinned = translator_hub.pin("en")
+
+    await translator_hub.update_translations("en", {"start-hello": "Hi", "start-bye": "Bye"})
+    assert translator.get("start-hello") == "Hi"
+    assert pinned.get("start-hello") == "Hello"
+    with pytest.raises(KeyNotFoundError):
+        pinned.get("start-bye")
+
+    await translator_hub.update_translation("en", "start-hello", "Hey")
+    en = translator_hub.storage.get_translator("en")
+    assert en.version == 3
+    assert en.snapshot(2).get("start-hello") == "Hi"
+
+    assert translator_hub.rollback_translations("en")
+    assert translator.get("start-hello") == "Hi"
+    assert translator_hub.rollback_translations("en", version=1)
+    assert translator.get("start-hello") == "Hello"
+    with pytest.raises(KeyNotFoundError):
+        translator.get("start-bye")
+    with pytest.raises(KeyError):
+        translator_hub.rollback_translations("en")
+
+
+@pytest.mark.asyncio
+async def test_merged_messages_follow_updates() -> None:
+    uk = FluentTranslator("uk", translator=FluentBundle.from_string("uk", "start-hello = Привіт"))
+    ru = FluentTranslator("ru", translator=FluentBundle.from_string("ru", "start-hello = Привет\nstart-bye = Пока"))
+    en = FluentTranslator("en", translator=FluentBundle.from_string("en", "start-bye = Bye\nstart-help = Help"))
+    translator_hub = TranslatorHub({"uk": ("uk", "ru", "en"), "en": "en"}, [uk, ru, en])
+    translator = translator_hub.get_translator_by_locale("uk")
+    merged = translator_hub.storage.get_merged_messages("uk")
+
+    assert merged.functions["start-hello"] is uk.snapshot().messages["start-hello"]
+    assert merged.functions["start-bye"] is ru.snapshot().messages["start-bye"]
+    assert merged.functions["start-help"] is en.snapshot().messages["start-help"]
+    assert translator.get("start-help") == "Help"
+
+    await translator_hub.update_translation("uk", "start-bye", "Бувай")
+    assert translator.get("start-bye") == "Бувай"
+    assert merged.functions["start-bye"] is ru.snapshot().messages["start-bye"]
+    merged = translator_hub.storage.get_merged_messages("uk")
+    assert merged.functions["start-bye"] is uk.snapshot().messages["start-bye"]
+
+    await translator_hub.delete_translation("uk", "start-bye")
+    assert translator.get("start-bye") == "Пока"
+
+    await translator_hub.update_translation("en", "start-new", "New")
+    assert translator.get("start-new") == "New"
+    await translator_hub.delete_translation("en", "start-new")
+    assert "start-new" not in translator_hub.storage.get_merged_messages("uk").functions
+
+
+@pytest.mark.asyncio
+async def test_merged_messages_of_a_batch_are_published_at_once() -> None:
+    en = FluentTranslator("en", translator=FluentBundle.from_string("en-US", "a = A1\nb = B1"))
+    translator_hub = TranslatorHub({"en": "en"}, [en])
+    translator = translator_hub.get_translator_by_locale("en")
+    seen: list[tuple[str, str]] = []
+    translator_hub.storage.add_update_listener(lambda *_: seen.append((translator.get("a"), translator.get("b"))))
+
+    await translator_hub.update_translations("en", {"a": "A2", "b": "B2"})
+    assert seen == [("A2", "B2"), ("A2", "B2")]
+
+
+def test_direct_translator_updates_reach_runners() -> None:
+    en = FluentTranslator("en", translator=FluentBundle.from_string("en-US", "start-hello = Hello"))
+    ru = FluentTranslator("ru", translator=FluentBundle.from_string("ru-RU", "start-hello = Привет"))
+    translator_hub = TranslatorHub({"en": "en", "ru": ("ru", "en")}, [en, ru])
+    translator = translator_hub.get_translator_by_locale("ru")
+    with pytest.raises(KeyNotFoundError):
+        translator.get("start-bye")
+
+    ru.update_translation("start-hello", "Здравствуй")
+    assert translator.get("start-hello") == "Здравствуй"
+    # Keys known to be missing become visible once added
+    en.update_translation("start-bye", "Bye")
+    assert translator.get("start-bye") == "Bye"
+    ru.rollback()
+    assert translator.get("start-hello") == "Привет"
+
+
+@pytest.mark.asyncio
+async def test_missing_keys_are_cached_until_added() -> None:
+    translator_hub = TranslatorHub(
+        {
+            "en": "en",
+            "ru": ("ru", "en"),
+        },
+        [
+            FluentTranslator("en", translator=FluentBundle.from_string("en-US", "start-hello = Hello")),
+            FluentTranslator("ru", translator=FluentBundle.from_string("ru-RU", "start-bye = Пока")),
+        ],
+    )
+    translator = translator_hub.get_translator_by_locale("ru")
+    for _ in range(3):
+        with pytest.raises(KeyNotFoundError):
+            translator.get("start-help")
+    with pytest.raises(KeyNotFoundError):
+        translator.get("start-about")
+
+    missing_keys = translator_hub.storage.get_missing_keys("ru")
+    assert translator_hub.missing_keys("ru") == [("start-help", 3), ("start-about", 1)]
+    assert missing_keys.repeated == 2
+
+    await translator_hub.update_translation("en", "start-help", "Help")
+    assert translator.get("start-help") == "Help"
+    assert translator_hub.missing_keys("ru") == [("start-about", 1)]
+
+
+def test_apply_publishes_a_single_version() -> None:
+    translator = FluentTranslator(
+        "en",
+        translator=FluentBundle.from_string("en-US", "start-hello = Hello\nstart-bye = Bye", use_isolating=False),
+    )
+    translator.update_translations({"start-hello": "Hi", "start-help": "Help"})
+    assert translator.version == 2
+
+    changed = translator.apply(translator.compile_translations({"start-bye": "See you"}), ["start-hello", "start-help"])
+    assert changed == {"start-hello", "start-help", "start-bye"}
+    assert translator.version == 3
+    assert [translator.get("start-hello"), translator.get("start-help"), translator.get("start-bye")] == [
+        "Hello",
+        None,
+        "See you",
+    ]
+
+    # Nothing to restore, so no version is published
+    assert translator.restore_messages(["start-hello"]) == set()
+    assert translator.version == 3
+    # A single rollback undoes the whole batch
+    translator.rollback()
+    assert [translator.get("start-hello"), translator.get("start-bye")] == ["Hi", "Bye"]